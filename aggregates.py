@@ -0,0 +1,39 @@
+import pandas as pd
+
+# Read side of the aggregate cube (published by processor.py as storage.AGGREGATES_FILE):
+# the shared constants and the lookups the dashboard and reports render from.
+# Kept free of the ETL imports so the app can use it without loading processor.py.
+
+EXP_UNKNOWN = -1
+EXP_OPEN_ENDED = 99
+# Experience bands for the dashboard (on Exp Min): label -> [low, high]
+EXPERIENCE_BANDS = {"0-1 Yrs": (0, 1), "2-4 Yrs": (2, 4), "5-9 Yrs": (5, 9), "10+ Yrs": (10, EXP_OPEN_ENDED)}
+
+# Aggregate cube: counts per single dimension and per useful pair
+CUBE_DIMENSIONS = ["Job Type", "City", "Company Name", "Job Title", "Level", "Years of Experience",
+                   "Experience Band", "Hiring Speed"]
+CUBE_PAIRS = [("City", "Level"), ("Company Name", "Job Title")]
+
+
+def cube_counts(cube, dimension, label, top=None):
+    """Counts for one cube dimension as a [label, 'Count'] frame, largest first."""
+    if cube.empty:
+        return pd.DataFrame(columns=[label, 'Count'])
+    counts = cube.loc[cube['Dimension'] == dimension, ['Value', 'Count']]
+    if top:
+        counts = counts.head(top)
+    return counts.rename(columns={'Value': label}).reset_index(drop=True)
+
+
+def cube_top(cube, dimension):
+    counts = cube_counts(cube, dimension, 'Value', top=1)
+    return counts['Value'].iloc[0] if not counts.empty else "N/A"
+
+
+def experience_counts(cube):
+    """Experience Band counts in band order ("Unknown" last, empty bands left out)."""
+    band_order = list(EXPERIENCE_BANDS) + ["Unknown"]
+    counts = cube_counts(cube, 'Experience Band', 'Experience')
+    counts = counts.set_index('Experience').reindex(band_order).dropna().reset_index()
+    counts['Count'] = counts['Count'].astype(int)
+    return counts
@@ -1,17 +1,23 @@
+import time
+SCRIPT_START = time.perf_counter()  # cold-start timing starts before the first import
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from streamlit_option_menu import option_menu
-import datetime
-import random
-import processor
-import plotly.io as pio
-
-# Configure default Plotly template for professional corporate look
-# Removed to allow Streamlit native theme formatting
-pass
+import metrics
+import storage
+import search
+import queries
+import bitmaps
+import aggregates
+import threading
+import os
+import subprocess
+import sys
 
+# The app never imports processor.py (the ETL stack: dedupe, SQLite build, metrics):
+# cube lookups and shared constants come from the small aggregates module.
+# plotly.express is only imported by the Dashboard branch, so the Details page never loads it.
+IMPORTS_SECONDS = time.perf_counter() - SCRIPT_START
 
 # === PAGE CONFIGURATION ===
 st.set_page_config(
@@ -175,63 +181,159 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # === DATA ENGINE ===
-def classify_hiring_speed(days):
-    if days < 10: return "Urgent Hiring (<10 Days)"
-    elif days <= 30: return "Moderate Hiring (10-30 Days)"
-    return "Slow Hiring (>30 Days)"
-
-@st.cache_data(ttl=3600, show_spinner=False)
-def generate_realistic_data():
-    """Generate data for Oct 2025 - Jan 2026 period"""
-    
-    roles = [
-        "Data Analyst", "Business Analyst", "Cost Analyst", "Credit Analyst",
-        "Commercial Specialist (Junior Data Analyst)", "Ads Sales Quality Analyst (QA)",
-        "Financial Analyst", "Business Analyst - Customer Solutions",
-        "Central Operations Senior Analyst", "Tax Accountant", "Full Stack Developer",
-        "Machine Learning Engineer", "DevOps Engineer", "Product Manager"
-    ]
-    
 # === DATA ENGINE ===
-@st.cache_data(ttl=3600, show_spinner=False)
-def load_real_data():
+# The app never runs the ETL itself. A background thread starts `python processor.py` in a
+# separate process every 15 minutes (a near no-op when nothing changed), so the ETL never
+# holds this server's GIL while sessions render. The processor takes a lock file, so several
+# server processes / replicas never refresh or publish at the same time. Pages only re-read
+# the CURRENT pointer: every cache below is keyed on the published data version, so new data
+# is picked up on the next rerun after a swap, and unchanged data is never reloaded.
+REFRESH_INTERVAL_SECONDS = 15 * 60
+REFRESH_TIMEOUT_SECONDS = 60 * 60
+PROCESSOR_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "processor.py")
+
+def _refresh_loop(interval):
+    while True:
+        try:
+            result = subprocess.run([sys.executable, PROCESSOR_SCRIPT], timeout=REFRESH_TIMEOUT_SECONDS)
+            if result.returncode != 0:
+                print(f"Background refresh failed (exit code {result.returncode})")
+        except Exception as e:
+            print(f"Background refresh failed: {e}")
+        time.sleep(interval)
+
+@st.cache_resource(show_spinner=False)
+def start_background_refresh(interval=REFRESH_INTERVAL_SECONDS):
+    """Starts the refresher thread once per server process (shared by all sessions)."""
+    thread = threading.Thread(target=_refresh_loop, args=(interval,), daemon=True, name="data-refresh")
+    thread.start()
+    return thread
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_db(data_version):
+    """Read-only SQLite connection for `data_version`, shared by all sessions (no per-session copy of the data)."""
+    return queries.connect(data_version)
+
+# The published .arrow files are memory-mapped: opening one costs no parsing, and
+# cache_resource hands the same object to every session (read-only, never mutated).
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_snapshot(data_version):
+    """Memory-mapped Arrow table of the clean data for `data_version` (columns load on first use)."""
+    return storage.read_arrow(storage.CLEAN_SNAPSHOT_FILE, data_version)
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_skill_counts(data_version):
+    """Skill frequency table precomputed by the processor (Skill ID, Skill, Count)."""
+    return storage.read_artifact(storage.SKILLS_FILE, data_version)
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_aggregates(data_version):
+    """Aggregate cube precomputed by the processor (Dimension, Value, Value 2, Count)."""
+    return storage.read_artifact(storage.AGGREGATES_FILE, data_version)
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_search_index(data_version):
     """
-    Triggers the ETL pipeline (processor.py) to ensure data is clean,
-    then loads the clean CSV.
+    Search index for the Details page, shared by all sessions. The processor publishes the
+    posting lists with the data version; here they are only memory-mapped (nothing is built).
     """
-    # 1. Trigger Processing (Ensure Clean CSV is synced with Raw CSV)
-    # This runs every time the cache is invalidated or on first run
-    df = processor.process_data()
-    
-    # Alternatively, we could read the file if processor returns nothing, 
-    # but processor.process_data() returns the DF directly.
-    if df.empty:
-         # Fallback try reading file if it exists
-         try:
-             df = pd.read_csv("data/wuzzuf_jobs_clean.csv")
-         except:
-             return pd.DataFrame()
+    index = search.SearchIndex.load(data_version)
+    if index is not None:
+        return index
+    # Version published before the search postings existed: build them in memory once
+    snapshot = load_snapshot(data_version)
+    if snapshot is None:
+        return search.SearchIndex.from_frame(queries.fetch_columns(get_db(data_version), search.SEARCH_COLUMNS))
+    return search.SearchIndex.from_frame(snapshot.select(search.SEARCH_COLUMNS).to_pandas())
+
+# Columns the cross-filter needs from the snapshot (chart dimensions + filters + cluster keys)
+CROSS_FILTER_COLUMNS = ["Job ID", "Cluster ID", "Job Type", "City", "Company Name", "Job Title", "Level",
+                        "Years of Experience", "Experience Band", "Hiring Speed"]
+
+@st.cache_resource(show_spinner="Indexing postings for filtering...", max_entries=2)
+def get_cross_filter(data_version):
+    """Bitmap indexes for the Dashboard filters. Built once per data version (on the first filter), shared."""
+    snapshot = load_snapshot(data_version)
+    if snapshot is not None:
+        df = snapshot.select([c for c in CROSS_FILTER_COLUMNS if c in snapshot.column_names]).to_pandas()
+    else:
+        df = storage.read_clean(version=data_version)
+    skills = load_skill_counts(data_version)
+    # Skill names indexed by Skill ID (job_skills refers to skills by id)
+    skill_names = skills.sort_values('Skill ID')['Skill'].to_numpy() if not skills.empty else []
+    job_skills = storage.read_artifact(storage.JOB_SKILLS_FILE, data_version)
+    return bitmaps.CrossFilter(df, job_skills, skill_names, aggregates.CUBE_DIMENSIONS)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def filtered_tables(data_version, selections):
+    """(cube, skill counts) for one filter combination: ((column, (values...)), ...)."""
+    return get_cross_filter(data_version).tables(dict(selections))
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def load_filter_options(data_version):
+    """Choices for the Details page filters (served from the column indexes)."""
+    conn = get_db(data_version)
+    options = {name: queries.distinct_values(conn, name) for name in queries.FILTER_COLUMNS}
+    options["Skill"] = queries.skill_names(conn)
+    return options
 
-    return df
+DETAILS_PAGE_SIZE = 100
+EXPERIENCE_SLIDER_MAX = 15  # the top of the slider means "15 years or more"
+
+# === STARTUP TIMING ===
+# Cold-start phases of this server process, measured on its first run of the script:
+#   imports      -> module imports at the top of app.py
+#   data         -> opening the published version (database, cube, skills)
+#   first_render -> script start until the first page is fully rendered
+# Written to data/metrics/app_startup_run.json and app_startup.prom (see README).
+APP_METRICS = metrics.Metrics("wuzzuf_app")
+
+@st.cache_resource(show_spinner=False)
+def startup_timings():
+    """Phase -> seconds, shared by all sessions (only the first run of the process fills it)."""
+    return {}
+
+def record_startup(phase, seconds):
+    timings = startup_timings()
+    if phase in timings:
+        return
+    timings[phase] = round(seconds, 4)
+    APP_METRICS.set("startup_seconds", seconds, labels={"phase": phase},
+                    help="Dashboard cold-start time by phase")
+    if phase == "first_render":
+        print("Startup: " + ", ".join(f"{name} {value:.3f}s" for name, value in timings.items()))
+        APP_METRICS.write("app_startup")
 
 # === MAIN APP ===
 def main():
-    df = load_real_data()
+    start_background_refresh()
+    record_startup("imports", IMPORTS_SECONDS)
+
+    # One small file read; everything below is cached per data version
+    data_version = storage.current_version()
+    if data_version is None:
+        st.warning("⏳ Data is being prepared in the background. Please refresh in a moment.")
+        return
+
+    conn = get_db(data_version)
+    skill_counts = load_skill_counts(data_version)
+    cube = load_aggregates(data_version)
+    record_startup("data", time.perf_counter() - SCRIPT_START - IMPORTS_SECONDS)
     
-    if df.empty:
+    total_listings = queries.count_jobs(conn) if conn is not None else 0
+    if total_listings == 0:
         st.error("⚠️ No data available. Please run the scraper or wait for the daily refresh to complete.")
-        st.info("Debugging info: `data/wuzzuf_jobs_raw.csv` might be empty or `processor.py` filtering removed all rows.")
+        st.info("Debugging info: `data/history/` might be empty or `processor.py` filtering removed all rows.")
         return
 
-    # Get Data Last Modified Date
-    import os
-    import time
-    try:
-        mod_time = os.path.getmtime("data/wuzzuf_jobs_raw.csv")
-        last_updated = time.strftime('%d %b %Y', time.localtime(mod_time))
+    # Get Data Last Updated Date (latest snapshot partition)
+    snapshot_dates = storage.list_dates()
+    if snapshot_dates:
+        last_updated = snapshot_dates[-1].strftime('%d %b %Y')
         # Since we don't have a "range" in the data, we show the snapshot date
         period_str = f"Data Snapshot: {last_updated}" 
-    except:
+    else:
+        last_updated = "Unknown"
         period_str = "Data Source: Unknown"
 
     # === SIDEBAR ===
@@ -261,21 +363,41 @@ def main():
     # === MAIN CONTENT ===
     
     if selected_nav == "Dashboard":
+        import plotly.express as px
         st.markdown(f"<div class='period-badge'>📅 {period_str}</div>", unsafe_allow_html=True)
+
+        # Cross-filters: choices come from the unfiltered cube / skills table, so the bitmap
+        # indexes are only built once someone actually filters. A selection is resolved by
+        # intersecting bitsets and every chart below then reads the filtered cube.
+        with st.expander("🔎 Filter the dashboard", expanded=False):
+            filter_boxes = st.columns(len(bitmaps.FILTER_COLUMNS))
+            selections = []
+            for box, column in zip(filter_boxes, bitmaps.FILTER_COLUMNS):
+                if column == "Skill":
+                    choices = skill_counts['Skill'].tolist() if not skill_counts.empty else []
+                else:
+                    choices = aggregates.cube_counts(cube, column, 'Value')['Value'].tolist()
+                selections.append((column, tuple(box.multiselect(column, choices))))
+        selections = tuple(selections)
+        filtered = any(values for _, values in selections)
+        if filtered:
+            cube, skill_counts = filtered_tables(data_version, selections)
         
         # KPIs
-        top_skill = "N/A"
-        if not df.empty:
-            all_skills = []
-            for skills_str in df['Skills']:
-                 all_skills.extend([s.strip() for s in str(skills_str).split(',') if s.strip()])
-            if all_skills:
-                top_skill = pd.Series(all_skills).mode()[0]
+        # Skill counts come precomputed from the processor (sorted by Count)
+        top_skill = skill_counts['Skill'].iloc[0] if not skill_counts.empty else "N/A"
 
         k1, k2, k3, k4 = st.columns(4)
-        k1.metric("Total Jobs", len(df))
-        k2.metric("Top City", df['City'].mode()[0] if not df.empty else "N/A")
-        k3.metric("Top Company", df['Company Name'].mode()[0] if not df.empty else "N/A")
+        # Everything on the Dashboard renders from the aggregate cube (no row-level scans)
+        # Cube counts are unique postings (near-duplicates from different queries counted once)
+        unique_postings = int(aggregates.cube_counts(cube, 'Level', 'Level')['Count'].sum())
+        if filtered:
+            k1.metric("Unique Postings", unique_postings, help="Unique postings matching the filters")
+        else:
+            k1.metric("Unique Postings", unique_postings,
+                      help=f"{total_listings} listings scraped, {total_listings - unique_postings} near-duplicates merged")
+        k2.metric("Top City", aggregates.cube_top(cube, 'City'))
+        k3.metric("Top Company", aggregates.cube_top(cube, 'Company Name'))
         k4.metric("Top Skill", top_skill)
         
         st.markdown("---")
@@ -289,8 +411,7 @@ def main():
             
             with col1:
                 st.subheader("Jobs by Job Type")
-                type_counts = df['Job Type'].value_counts().reset_index()
-                type_counts.columns = ['Type', 'Count']
+                type_counts = aggregates.cube_counts(cube, 'Job Type', 'Type')
                 
                 fig_type = px.pie(type_counts, values='Count', names='Type', hole=0.5,
                                   color_discrete_sequence=px.colors.sequential.Blues_r)
@@ -307,8 +428,7 @@ def main():
             
             with col2:
                 st.subheader("Job Distribution by City")
-                city_counts = df['City'].value_counts().head(7).reset_index()
-                city_counts.columns = ['City', 'Count']
+                city_counts = aggregates.cube_counts(cube, 'City', 'City', top=7)
                 
                 fig_city = px.bar(city_counts, x='Count', y='City', orientation='h', text_auto=True)
                 fig_city.update_traces(
@@ -327,8 +447,7 @@ def main():
                 st.plotly_chart(fig_city, use_container_width=True)
             
             st.subheader("Top Hiring Companies")
-            comp_counts = df['Company Name'].value_counts().head(10).reset_index()
-            comp_counts.columns = ['Company', 'Count']
+            comp_counts = aggregates.cube_counts(cube, 'Company Name', 'Company', top=10)
             
             fig_comp = px.bar(comp_counts, x='Count', y='Company', orientation='h', text_auto=True,
                             color='Count', color_continuous_scale=['#93c5fd', '#1e40af'])
@@ -346,8 +465,7 @@ def main():
         # === TAB 2: ROLE ANALYSIS ===
         with tab2:
             st.subheader("Most In-Demand Job Titles")
-            title_counts = df['Job Title'].value_counts().head(10).reset_index()
-            title_counts.columns = ['Title', 'Count']
+            title_counts = aggregates.cube_counts(cube, 'Job Title', 'Title', top=10)
             
             fig_titles = px.bar(title_counts, x='Count', y='Title', orientation='h', text_auto=True,
                                color='Count', color_continuous_scale=['#bae6fd', '#0284c7'])
@@ -363,16 +481,8 @@ def main():
             st.plotly_chart(fig_titles, use_container_width=True)
             
             st.subheader("Top Required Skills")
-            # Parse skills string again for chart
-            all_skills = []
-            for skills_str in df['Skills']:
-                 # Handle cases where scraped skills are clean or messy
-                 parts = [s.strip() for s in str(skills_str).split(',') if s.strip()]
-                 all_skills.extend(parts)
-            
-            if all_skills:
-                skills_df = pd.Series(all_skills).value_counts().head(15).reset_index()
-                skills_df.columns = ['Skill', 'Count']
+            if not skill_counts.empty:
+                skills_df = skill_counts[['Skill', 'Count']].head(15)
                 
                 fig_skills = px.bar(skills_df, x='Count', y='Skill', orientation='h', text_auto=True)
                 fig_skills.update_traces(
@@ -397,9 +507,8 @@ def main():
             
             with c1:
                 st.subheader("Distribution by Career Level")
-                if 'Level' in df.columns:
-                    level_counts = df['Level'].value_counts().reset_index()
-                    level_counts.columns = ['Level', 'Count']
+                level_counts = aggregates.cube_counts(cube, 'Level', 'Level')
+                if not level_counts.empty:
                     
                     fig_level = px.bar(level_counts, x='Level', y='Count', text_auto=True,
                                       color_discrete_sequence=['#60a5fa'])
@@ -415,15 +524,14 @@ def main():
             
             with c2:
                 st.subheader("Years of Experience")
-                if 'Years of Experience' in df.columns:
-                    # Clean up experience text slightly for better grouping if needed, 
-                    # but raw value counts often work for scraped categories
-                    clean_exp = df['Years of Experience'].replace('nan', 'Unknown').fillna('Unknown')
-                    exp_counts = clean_exp.value_counts().head(8).reset_index()
-                    exp_counts.columns = ['Experience', 'Count']
+                # Bands come from the numeric Exp Min column; shown in band order, "Unknown" last
+                exp_counts = aggregates.experience_counts(cube)
+                band_order = list(aggregates.EXPERIENCE_BANDS) + ["Unknown"]
+                if not exp_counts.empty:
                     
                     fig_exp = px.bar(exp_counts, x='Count', y='Experience', orientation='h', text_auto=True,
-                                    color_discrete_sequence=['#818cf8'])
+                                    color_discrete_sequence=['#818cf8'],
+                                    category_orders={'Experience': band_order})
                     fig_exp.update_traces(textposition='outside', textfont=dict(color='#f8fafc', weight='bold'))
                     fig_exp.update_layout(
                         paper_bgcolor='rgba(0,0,0,0)',
@@ -433,22 +541,76 @@ def main():
                     )
                     st.plotly_chart(fig_exp, use_container_width=True)
 
+            st.subheader("Hiring Speed")
+            # Listing window (posting -> application deadline) from the job detail pages
+            speed_counts = aggregates.cube_counts(cube, 'Hiring Speed', 'Speed')
+            speed_counts = speed_counts[speed_counts['Speed'] != "Unknown"]
+            if not speed_counts.empty:
+                fig_speed = px.pie(speed_counts, values='Count', names='Speed', hole=0.5, color='Speed',
+                                   color_discrete_map={"Urgent Hiring (<10 Days)": '#ef4444',
+                                                       "Moderate Hiring (10-30 Days)": '#f59e0b',
+                                                       "Slow Hiring (>30 Days)": '#22c55e'})
+                fig_speed.update_traces(textposition='inside', textinfo='percent+label',
+                                        textfont=dict(size=13, weight='bold', color='white'))
+                fig_speed.update_layout(
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='#f8fafc', size=12),
+                    showlegend=False,
+                    margin=dict(t=30, b=10, l=10, r=10)
+                )
+                st.plotly_chart(fig_speed, use_container_width=True)
+            else:
+                st.info("No posting dates yet. Run `scraper.py --details 300` to fetch job detail pages.")
+
             st.markdown("### Raw Data Sample")
-            st.dataframe(df.head(10), use_container_width=True)
+            st.dataframe(queries.fetch_jobs(conn, limit=10), use_container_width=True)
 
     # === DETAILS PAGE ===
     elif selected_nav == "Details":
         st.subheader("Complete Job Listings")
-        st.markdown(f"**Total Records:** {len(df)}")
+        
+        # Filters (each one hits an index in the SQLite database)
+        options = load_filter_options(data_version)
+        f1, f2, f3, f4, f5 = st.columns(5)
+        filters = {}
+        for column, name in zip([f1, f2, f3, f4], queries.FILTER_COLUMNS):
+            choice = column.selectbox(name, ["All"] + options[name])
+            filters[name] = None if choice == "All" else choice
+        skill_choice = f5.selectbox("Skill", ["All"] + options["Skill"])
+        skill = None if skill_choice == "All" else skill_choice
+
+        # Range filter on the numeric experience columns (overlap with the selected years)
+        exp_low, exp_high = st.slider("Years of Experience", 0, EXPERIENCE_SLIDER_MAX, (0, EXPERIENCE_SLIDER_MAX))
+        experience = None
+        if (exp_low, exp_high) != (0, EXPERIENCE_SLIDER_MAX):
+            experience = (exp_low, aggregates.EXP_OPEN_ENDED if exp_high == EXPERIENCE_SLIDER_MAX else exp_high)
         
         # Search box
         search_term = st.text_input("🔍 Search by Title, Company, or Skill", "")
         
         if search_term:
-            mask = df.apply(lambda row: row.astype(str).str.contains(search_term, case=False).any(), axis=1)
-            df_display = df[mask]
+            # Search hits (Job IDs) intersected with the filtered ids, then paged in Python
+            hits = get_search_index(data_version).search(search_term)
+            if any(filters.values()) or skill or experience:
+                hits = sorted(set(queries.matching_ids(conn, filters, skill, experience)).intersection(hits.tolist()))
+            total = len(hits)
+        else:
+            total = queries.count_jobs(conn, filters, skill, experience)
+        
+        if search_term:
+            st.markdown(f"**Total Records:** {total}")
+        else:
+            st.markdown(f"**Total Records:** {total} ({queries.count_postings(conn, filters, skill, experience)} unique postings)")
+        pages = max(1, -(-total // DETAILS_PAGE_SIZE))
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1) - 1
+        offset = page * DETAILS_PAGE_SIZE
+        
+        if search_term:
+            page_ids = hits[offset:offset + DETAILS_PAGE_SIZE]
+            df_display = queries.fetch_jobs(conn, job_ids=page_ids, limit=DETAILS_PAGE_SIZE)
         else:
-            df_display = df
+            df_display = queries.fetch_jobs(conn, filters, skill, limit=DETAILS_PAGE_SIZE, offset=offset,
+                                            experience=experience)
             
         st.dataframe(
             df_display,
@@ -464,4 +626,5 @@ def main():
 
 if __name__ == "__main__":
     main()
+    record_startup("first_render", time.perf_counter() - SCRIPT_START)
 
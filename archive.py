@@ -0,0 +1,88 @@
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+# Every fetched search page, compressed and append-only, so extraction can be re-run
+# offline when the card selectors change (see replay.py):
+#   data/html_archive/date=2026-01-15/pages-<run_id>.gz   one gzip member per page
+#   data/html_archive/index.jsonl                         query, page, time, file, offset, length
+# A page is read back with one seek + one gzip.decompress, no scanning.
+ARCHIVE_DIR = "data/html_archive"
+INDEX_NAME = "index.jsonl"
+COMPRESSION_LEVEL = 6
+
+
+class PageArchive:
+    """Appends fetched pages of one scraper run to the archive (thread-safe)."""
+    def __init__(self, run_id, archive_dir=ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        self.run_id = run_id
+        self.lock = threading.Lock()
+        self.pages = 0
+
+    def add(self, query, page, url, content, fetched_at=None):
+        fetched_at = fetched_at or datetime.datetime.now()
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        blob = gzip.compress(content, compresslevel=COMPRESSION_LEVEL)
+        rel_path = os.path.join(f"date={fetched_at.date().isoformat()}", f"pages-{self.run_id}.gz")
+        path = os.path.join(self.archive_dir, rel_path)
+
+        with self.lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Data first, then the index line: the index never points at a half-written page
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(blob)
+            entry = {
+                "query": query,
+                "page": page,
+                "url": url,
+                "fetched_at": fetched_at.isoformat(timespec="seconds"),
+                "file": rel_path,
+                "offset": offset,
+                "length": len(blob),
+                "sha1": hashlib.sha1(content).hexdigest(),
+            }
+            with open(os.path.join(self.archive_dir, INDEX_NAME), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.pages += 1
+
+
+def read_index(archive_dir=ARCHIVE_DIR, start_date=None, end_date=None, queries=None):
+    """
+    Index entries of archived pages, oldest first.
+    start_date / end_date (inclusive, date or 'YYYY-MM-DD') and queries narrow it down.
+    """
+    path = os.path.join(archive_dir, INDEX_NAME)
+    if not os.path.exists(path):
+        return []
+    start = str(start_date) if start_date else None
+    end = str(end_date) if end_date else None
+    wanted = set(queries) if queries else None
+
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # half-written last line of an interrupted run
+            day = entry["fetched_at"][:10]
+            if (start and day < start) or (end and day > end):
+                continue
+            if wanted is not None and entry["query"] not in wanted:
+                continue
+            entries.append(entry)
+    entries.sort(key=lambda e: (e["fetched_at"], e["query"], e["page"]))
+    return entries
+
+
+def load_page(entry, archive_dir=ARCHIVE_DIR):
+    """Body of an archived page (bytes)."""
+    with open(os.path.join(archive_dir, entry["file"]), "rb") as f:
+        f.seek(entry["offset"])
+        return gzip.decompress(f.read(entry["length"]))
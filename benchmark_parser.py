@@ -0,0 +1,62 @@
+import argparse
+import glob
+import os
+import time
+
+import scraper
+
+FIXTURES_DIR = "data/fixtures"
+
+
+def load_fixtures(dirs):
+    """Reads every saved search page (*.html) from the given directories."""
+    pages = []
+    for d in dirs:
+        for path in sorted(glob.glob(os.path.join(d, "*.html"))):
+            with open(path, "rb") as f:
+                pages.append((path, f.read()))
+    return pages
+
+
+def time_path(pages, fast, repeat):
+    """Parses all pages `repeat` times. Returns (seconds, cards parsed, jobs of the last round)."""
+    cards = 0
+    results = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [scraper.extract_jobs(content, fast=fast) for _, content in pages]
+        cards += sum(len(jobs) for jobs in results)
+    return time.perf_counter() - start, cards, results
+
+
+def run_benchmark(dirs, repeat=20):
+    pages = load_fixtures(dirs)
+    if not pages:
+        print(f"No HTML fixtures found in {dirs}. Save some search pages there first.")
+        return
+
+    print(f"Benchmarking {len(pages)} pages x {repeat} rounds (fast parser: {scraper.FAST_PARSER})")
+    old_secs, old_cards, old_jobs = time_path(pages, fast=False, repeat=repeat)
+    new_secs, new_cards, new_jobs = time_path(pages, fast=True, repeat=repeat)
+
+    # The fast path must produce exactly the same records
+    mismatches = [path for (path, _), a, b in zip(pages, old_jobs, new_jobs) if a != b]
+
+    print(f"  old (html.parser, full page): {old_cards / old_secs:10.1f} cards/sec ({old_secs:.2f}s)")
+    print(f"  new (lxml.html + XPath):       {new_cards / new_secs:10.1f} cards/sec ({new_secs:.2f}s)")
+    print(f"  speedup: {old_secs / new_secs:.2f}x")
+    if mismatches:
+        print(f"  WARNING: output differs on {len(mismatches)} page(s):")
+        for path in mismatches:
+            print(f"    {path}")
+    else:
+        print("  Outputs match field for field.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the old vs fast job card parser.")
+    parser.add_argument("dirs", nargs="*", default=[FIXTURES_DIR, scraper.HTTP_CACHE_DIR],
+                        help="Directories with saved search pages (*.html)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run_benchmark(args.dirs, args.repeat)
@@ -0,0 +1,170 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import processor
+import search
+import storage
+import synthetic
+
+RESULTS_DIR = "data/benchmarks"
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+# The old row-by-row code paths take minutes on big frames; only time them up to this size
+LEGACY_MAX_ROWS = 100_000
+SEARCH_TERMS = ["python", "data analyst", "maadi", "sq", "nile delta"]
+COLD_IMPORT_MODULES = ["plotly.express", "processor"]
+
+
+def timed(fn, *args, **kwargs):
+    """Runs fn once, returns (seconds, result)."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+# === Legacy code paths (as they were in app.py before the precomputed tables) ===
+def legacy_skill_counts(df):
+    all_skills = []
+    for skills_str in df['Skills']:
+        all_skills.extend([s.strip() for s in str(skills_str).split(',') if s.strip()])
+    return pd.Series(all_skills).value_counts()
+
+
+def legacy_dashboard_counts(df):
+    counts = {col: df[col].value_counts() for col in processor.CUBE_DIMENSIONS}
+    modes = (df['City'].mode()[0], df['Company Name'].mode()[0])
+    return counts, modes
+
+
+def legacy_search(df, term):
+    mask = df.apply(lambda row: row.astype(str).str.contains(term, case=False).any(), axis=1)
+    return df[mask]
+
+
+# === Current code paths ===
+def cube_dashboard_counts(cube):
+    return {dim: cube[cube['Dimension'] == dim] for dim in processor.CUBE_DIMENSIONS}
+
+
+def snapshot_columns(snapshot, columns):
+    """Columns of the mapped snapshot as a DataFrame (what a search page load decodes)."""
+    return snapshot.select(columns).to_pandas()
+
+
+def run_size(n_rows, seed):
+    """Benchmarks one dataset size inside a scratch directory. Returns {metric: seconds}."""
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # All storage paths are relative to the working directory
+        os.chdir(tmp)
+        try:
+            results["generate"], raw = timed(synthetic.generate_raw_data, n_rows, seed)
+            storage.write_snapshot(raw)
+            del raw
+
+            results["process_data_full"], version = timed(processor.refresh_artifacts, force=True)
+            results["process_data_noop"], _ = timed(processor.refresh_artifacts)
+
+            # Dashboard cold start: decoding the Parquet file vs memory-mapping the Arrow snapshot
+            results["load_clean_parquet"], _ = timed(storage.read_clean, version=version)
+            results["open_clean_snapshot"], snapshot = timed(storage.read_arrow, storage.CLEAN_SNAPSHOT_FILE, version)
+            results["snapshot_search_columns"], _ = timed(snapshot_columns, snapshot,
+                                                          search.SEARCH_COLUMNS)
+            del snapshot
+
+            df = storage.read_clean(version=version)
+            cube = storage.read_artifact(storage.AGGREGATES_FILE, version)
+            results["rows_clean"] = len(df)
+
+            results["skills_table"], _ = timed(processor.build_skills_tables, df)
+            results["dashboard_cube_lookup"], _ = timed(cube_dashboard_counts, cube)
+
+            # Search postings: built by the processor, only memory-mapped by the app
+            results["search_index_build"], _ = timed(search.build_search_tables, df)
+            results["search_index_open"], index = timed(search.SearchIndex.load, version)
+            query_times = [timed(index.search, term)[0] for term in SEARCH_TERMS]
+            results["search_query_avg"] = sum(query_times) / len(query_times)
+
+            if n_rows <= LEGACY_MAX_ROWS:
+                results["legacy_skills_loop"], _ = timed(legacy_skill_counts, df)
+                results["legacy_dashboard_value_counts"], _ = timed(legacy_dashboard_counts, df)
+                results["legacy_search_query"], _ = timed(legacy_search, df, SEARCH_TERMS[0])
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def cold_import_seconds(module):
+    """Import time of `module` in a fresh interpreter (what a new app container pays)."""
+    code = f"import time; s = time.perf_counter(); import {module}; print(time.perf_counter() - s)"
+    try:
+        return float(subprocess.check_output([sys.executable, "-c", code], text=True, stderr=subprocess.DEVNULL).strip())
+    except Exception:
+        return None  # module not installed here
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current, previous_path):
+    """Prints current / previous time ratios per metric (>1 means slower now)."""
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = json.load(f)
+    print(f"\nCompared with {previous_path} ({previous.get('git_commit')}):")
+    for size, metrics in current["sizes"].items():
+        old = previous["sizes"].get(size, {})
+        for metric, secs in metrics.items():
+            if metric in old and old[metric] and not metric.startswith("rows"):
+                ratio = secs / old[metric]
+                flag = "  <-- REGRESSION" if ratio > 1.2 else ""
+                print(f"  {size:>9} {metric:32s} {ratio:6.2f}x{flag}")
+
+
+def run_benchmarks(sizes, seed=42, output_dir=RESULTS_DIR):
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "seed": seed,
+        "sizes": {},
+        # Modules the app now imports lazily (not paid before the first render)
+        "cold_imports": {m: cold_import_seconds(m) for m in COLD_IMPORT_MODULES},
+    }
+    print(f"Cold imports: {report['cold_imports']}")
+    for n in sizes:
+        print(f"Benchmarking {n} rows...")
+        report["sizes"][str(n)] = metrics = run_size(n, seed)
+        for metric, secs in metrics.items():
+            print(f"  {metric:32s} {secs:10.4f}" if isinstance(secs, float) else f"  {metric:32s} {secs:10d}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"scale-{report['timestamp'].replace(':', '')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved results to {path}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scale benchmarks on synthetic job data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+    report = run_benchmarks(args.sizes, args.seed)
+    if args.compare:
+        compare(report, args.compare)
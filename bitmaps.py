@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+
+# Columns the Dashboard can be filtered on (one bitset per value; "Skill" comes from job_skills)
+FILTER_COLUMNS = ["City", "Level", "Job Type", "Company Name", "Skill"]
+
+# A value gets a dense bitset (1 bit per row) when that is smaller than its sorted row ids
+# (4 bytes per row): more than 1 row in 32. Rare values (most companies, titles, skills)
+# stay as row-id arrays. Same idea as Roaring's array / bitmap containers, per value.
+DENSE_FRACTION = 1 / 32
+
+
+def _words(n_rows):
+    return (n_rows + 63) // 64
+
+
+def _bits(rows, n_rows):
+    """Dense bitset (uint64 words, bit r % 64 of word r // 64) of the given row positions."""
+    flags = np.zeros(_words(n_rows) * 64, dtype=bool)
+    flags[rows] = True
+    return np.packbits(flags, bitorder="little").view(np.uint64)
+
+
+def _popcount(words):
+    """Set bits per row of a uint64 array (summed over the last axis)."""
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    as_bytes = words.view(np.uint8).reshape(words.shape[:-1] + (-1,))
+    return np.unpackbits(as_bytes, axis=-1).sum(axis=-1, dtype=np.int64)
+
+
+class BitmapIndex:
+    """
+    Row set of every value of one column, as compressed bitsets:
+    frequent values are dense bitsets (AND + popcount), rare values are sorted
+    row-id arrays (bit tests against the filter). Multi-valued columns (skills)
+    are built from (row, value) pairs. Read-only after it's built.
+    """
+    def __init__(self, rows, codes, values, n_rows):
+        self.n_rows = n_rows
+        order = np.lexsort((rows, codes))
+        rows, codes = rows[order].astype(np.int64), codes[order]
+        cards = np.bincount(codes, minlength=len(values))
+        offsets = np.r_[0, np.cumsum(cards)]
+
+        present = np.flatnonzero(cards)
+        dense = present[cards[present] > DENSE_FRACTION * n_rows]
+        sparse = present[cards[present] <= DENSE_FRACTION * n_rows]
+        values = np.asarray(values, dtype=object)
+
+        self.values = values[present]
+        self.cards = cards[present]
+        self.dense_values = values[dense]
+        self.dense = (np.stack([_bits(rows[offsets[c]:offsets[c + 1]], n_rows) for c in dense])
+                      if len(dense) else np.zeros((0, _words(n_rows)), dtype=np.uint64))
+        # Sparse values as one CSR block: sparse_rows[sparse_offsets[i]:sparse_offsets[i + 1]]
+        self.sparse_values = values[sparse]
+        self.sparse_rows = (np.concatenate([rows[offsets[c]:offsets[c + 1]] for c in sparse])
+                            if len(sparse) else np.zeros(0, dtype=np.int64))
+        self.sparse_offsets = np.r_[0, np.cumsum(cards[sparse])]
+        self._dense_pos = {v: i for i, v in enumerate(self.dense_values)}
+        self._sparse_pos = {v: i for i, v in enumerate(self.sparse_values)}
+
+    @classmethod
+    def from_column(cls, column, rows=None):
+        """Index of a single-valued column; `rows` limits it to those row positions."""
+        codes, values = pd.factorize(column.astype(str).replace("nan", "Unknown"))
+        positions = np.arange(len(codes))
+        if rows is not None:
+            positions, codes = positions[rows], codes[rows]
+        return cls(positions, codes, values, len(column))
+
+    def options(self):
+        """Values, most frequent first."""
+        order = np.lexsort((self.values.astype(str), -self.cards))
+        return list(self.values[order])
+
+    def mask(self, selected):
+        """Bitset of the rows having any of the selected values."""
+        words = np.zeros(_words(self.n_rows), dtype=np.uint64)
+        for value in selected:
+            if value in self._dense_pos:
+                words |= self.dense[self._dense_pos[value]]
+            elif value in self._sparse_pos:
+                i = self._sparse_pos[value]
+                words |= _bits(self.sparse_rows[self.sparse_offsets[i]:self.sparse_offsets[i + 1]], self.n_rows)
+        return words
+
+    def counts(self, mask=None):
+        """Rows per value (within `mask` if given), as a Series sorted by count desc then value."""
+        if mask is None:
+            counts = pd.Series(self.cards, index=self.values)
+        else:
+            dense = _popcount(self.dense & mask)
+            # Bit test of every sparse row id against the filter, summed per value
+            rows = self.sparse_rows
+            hits = ((mask[rows >> 6] >> (rows & 63).astype(np.uint64)) & np.uint64(1)).astype(np.int64)
+            sparse = (np.add.reduceat(hits, self.sparse_offsets[:-1]) if len(rows)
+                      else np.zeros(0, dtype=np.int64))
+            counts = pd.Series(np.r_[dense, sparse], index=np.r_[self.dense_values, self.sparse_values])
+            counts = counts[counts > 0]
+        counts = counts.reset_index().set_axis(["Value", "Count"], axis=1)
+        return counts.sort_values(["Count", "Value"], ascending=[False, True], ignore_index=True)
+
+
+class CrossFilter:
+    """
+    Bitmap indexes over the unique postings of one data version.
+    A filter combination is resolved to one bitset (OR within a column, AND across
+    columns) and every chart count is a popcount against it, so no interaction
+    re-scans or re-groups the rows.
+    """
+    def __init__(self, df, job_skills, skill_names, dimensions):
+        n_rows = len(df)
+        # Near-duplicates are counted once, as in the aggregate cube (Job ID = row position)
+        if 'Cluster ID' in df.columns:
+            unique_rows = np.flatnonzero((df['Cluster ID'] == df['Job ID']).to_numpy())
+        else:
+            unique_rows = np.arange(n_rows)
+        self.universe = _bits(unique_rows, n_rows)
+        self.total = len(unique_rows)
+
+        columns = [c for c in dict.fromkeys(dimensions + FILTER_COLUMNS) if c in df.columns]
+        self.indexes = {c: BitmapIndex.from_column(df[c], unique_rows) for c in columns}
+        if job_skills is not None and len(job_skills):
+            is_unique = np.zeros(n_rows, dtype=bool)
+            is_unique[unique_rows] = True
+            pairs = job_skills[is_unique[job_skills["Job ID"].to_numpy()]]
+            self.indexes["Skill"] = BitmapIndex(pairs["Job ID"].to_numpy(), pairs["Skill ID"].to_numpy(),
+                                                skill_names, n_rows)
+        self.dimensions = [d for d in dimensions if d in self.indexes]
+
+    def options(self, column):
+        return self.indexes[column].options() if column in self.indexes else []
+
+    def mask(self, selections):
+        """Bitset of the unique postings matching every non-empty selection ({column: [values]})."""
+        mask = self.universe.copy()
+        for column, selected in selections.items():
+            if selected and column in self.indexes:
+                mask &= self.indexes[column].mask(selected)
+        return mask
+
+    def count(self, selections):
+        return int(_popcount(self.mask(selections)))
+
+    def tables(self, selections):
+        """
+        (cube, skills) for a filter combination, shaped like the published artifacts:
+        cube -> Dimension, Value, Value 2, Count (single dimensions only); skills -> Skill, Count.
+        """
+        mask = self.mask(selections)
+        frames = []
+        for dimension in self.dimensions:
+            counts = self.indexes[dimension].counts(mask)
+            counts.insert(0, "Dimension", dimension)
+            counts.insert(2, "Value 2", "")
+            frames.append(counts)
+        cube = (pd.concat(frames, ignore_index=True) if frames
+                else pd.DataFrame(columns=["Dimension", "Value", "Value 2", "Count"]))
+        if "Skill" in self.indexes:
+            skills = self.indexes["Skill"].counts(mask).rename(columns={"Value": "Skill"})
+        else:
+            skills = pd.DataFrame(columns=["Skill", "Count"])
+        return cube, skills
@@ -0,0 +1,152 @@
+import re
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# Near-duplicate postings: the same job reached through different queries often differs in
+# title casing, skill order or location, so exact drop_duplicates misses it.
+# MinHash signatures over normalized title / company / skills tokens are bucketed with LSH
+# (banding), every pair in a bucket is verified against the similarity threshold, and the
+# verified pairs are merged into clusters (connected components).
+# The bands are chosen so that no pair above the threshold can miss every bucket.
+
+NUM_PERM = 64          # MinHash permutations (signature length)
+THRESHOLD = 0.9        # estimated Jaccard similarity needed to call two postings duplicates
+                       # (>= 58 of 64 equal positions -> 7 LSH bands of 9-10 positions, see _bands)
+SEED = 1
+CHUNK_TOKENS = 100_000  # tokens hashed per batch: the NUM_PERM x tokens uint64 matrix stays ~50 MB
+
+# Largest prime below 2^32: a * x + b stays inside uint64 for 32-bit a, b, x
+PRIME = 4294967291
+WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def posting_tokens(title, company, skills):
+    """Normalized feature set of one posting (prefixed so a title word never matches a skill)."""
+    tokens = {"t:" + w for w in WORD_RE.findall(str(title).lower())}
+    tokens |= {"c:" + w for w in WORD_RE.findall(str(company).lower())}
+    tokens |= {"s:" + " ".join(WORD_RE.findall(s.lower())) for s in str(skills).split(",") if s.strip()}
+    return tokens or {""}
+
+
+def _permutations(num_perm=NUM_PERM, seed=SEED):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, PRIME, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, PRIME, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signatures(token_sets, num_perm=NUM_PERM, seed=SEED):
+    """
+    (n, num_perm) uint32 MinHash signatures of a list of token sets.
+    Tokens are hashed with crc32 (stable across runs), permuted with (a*x + b) mod p
+    in one numpy pass per chunk, and reduced per posting with np.minimum.reduceat.
+    """
+    a, b = _permutations(num_perm, seed)
+    signatures = np.empty((len(token_sets), num_perm), dtype=np.uint32)
+    start = 0
+    while start < len(token_sets):
+        # Take whole postings until the chunk holds ~CHUNK_TOKENS tokens
+        end, size = start, 0
+        while end < len(token_sets) and (size == 0 or size + len(token_sets[end]) <= CHUNK_TOKENS):
+            size += len(token_sets[end])
+            end += 1
+        chunk = token_sets[start:end]
+        hashes = np.fromiter((zlib.crc32(t.encode("utf-8")) for tokens in chunk for t in tokens),
+                             dtype=np.uint64, count=size)
+        offsets = np.cumsum([0] + [len(tokens) for tokens in chunk[:-1]])
+        # One NUM_PERM x tokens buffer, updated in place (no temporaries of the same size)
+        permuted = a[:, None] * hashes[None, :]
+        permuted += b[:, None]
+        permuted %= np.uint64(PRIME)
+        signatures[start:end] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        start = end
+    return signatures
+
+
+def _bands(num_perm, min_equal):
+    """
+    Position ranges of the LSH bands. Two signatures that agree on >= min_equal positions differ
+    in at most num_perm - min_equal of them, so with one band more than that they agree on a whole
+    band: every pair that passes the threshold shares at least one bucket.
+    """
+    bands = min(num_perm, num_perm - min_equal + 1)
+    edges = np.linspace(0, num_perm, bands + 1).astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _bucket_pairs(keys):
+    """(i, j) index pairs of every two signatures with the same bucket key, in chunks (by distance in sort order)."""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    # End (exclusive) of the bucket of every sorted position
+    ends = np.repeat(np.r_[starts[1:], len(keys)], np.diff(np.r_[starts, len(keys)]))
+    active = np.flatnonzero(ends - np.arange(len(keys)) > 1)
+    distance = 1
+    while len(active):
+        yield order[active], order[active + distance]
+        distance += 1
+        active = active[ends[active] - active > distance]
+
+
+def _components(n, first, second):
+    """Connected component of every node, labelled with its smallest index (vectorized union-find)."""
+    label = np.arange(n)
+    while True:
+        low = np.minimum(label[first], label[second])
+        before = label.copy()
+        np.minimum.at(label, first, low)
+        np.minimum.at(label, second, low)
+        label = label[label]  # pointer jumping
+        if np.array_equal(label, before):
+            return label
+
+
+def lsh_clusters(signatures, threshold=THRESHOLD):
+    """
+    Cluster label (index of the cluster's first member) for every signature: the connected
+    components of all pairs whose signatures agree on >= threshold of positions.
+    Candidate pairs come from the LSH buckets (see _bands, no qualifying pair is missed) and
+    every candidate is verified, so the result is the same as comparing all pairs.
+    """
+    # Identical signatures always share a cluster: bucket each distinct signature once
+    distinct, first_rows, inverse = np.unique(signatures, axis=0, return_index=True, return_inverse=True)
+    n, num_perm = distinct.shape
+    min_equal = int(np.ceil(threshold * num_perm))
+    firsts, seconds = [], []
+    for low, high in _bands(num_perm, min_equal):
+        # Bucket key of the band (hash collisions are harmless, candidates are verified below)
+        keys = np.zeros(n, dtype=np.uint64)
+        for j in range(low, high):
+            keys = keys * np.uint64(1000003) ^ distinct[:, j].astype(np.uint64)
+        for i, j in _bucket_pairs(keys):
+            similar = np.count_nonzero(distinct[i] == distinct[j], axis=1) >= min_equal
+            firsts.append(i[similar])
+            seconds.append(j[similar])
+    first = np.concatenate(firsts) if firsts else np.zeros(0, dtype=np.int64)
+    second = np.concatenate(seconds) if seconds else np.zeros(0, dtype=np.int64)
+    # Components of the distinct signatures -> of the original rows, labelled by their smallest index
+    labels = first_rows[_components(n, first, second)][inverse.ravel()]
+    return pd.Series(np.arange(len(signatures))).groupby(labels).transform("min").to_numpy()
+
+
+def cluster_ids(df):
+    """
+    Near-duplicate cluster of every row, as the Job ID of the cluster's first row.
+    Identical (title, company, skills) rows share one signature, so MinHash only
+    runs once per distinct posting text.
+    """
+    keys = (df['Job Title'].astype(str) + "\x1f" + df['Company Name'].astype(str)
+            + "\x1f" + df['Skills'].astype(str))
+    codes, uniques = pd.factorize(keys)
+    if len(uniques) == 0:
+        return pd.Series(np.array([], dtype="int32"), index=df.index)
+    token_sets = [posting_tokens(*key.split("\x1f")) for key in uniques]
+    labels = lsh_clusters(minhash_signatures(token_sets))[codes]
+
+    # Label -> smallest Job ID among the rows of the cluster
+    job_ids = df['Job ID'].to_numpy()
+    first_job = pd.Series(job_ids).groupby(labels).transform("min").to_numpy()
+    return pd.Series(first_job.astype("int32"), index=df.index)
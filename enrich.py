@@ -0,0 +1,176 @@
+import argparse
+import datetime
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+import scraper
+import storage
+
+# Job detail pages carry what the search cards don't: posting date, application
+# deadline, vacancies and the full requirements. Each posting is fetched once
+# (storage.JOB_DETAILS_PATH is the cache), so the daily cost is one request per new job.
+BASE_URL = "https://wuzzuf.net"
+DETAIL_WORKERS = 2            # detail pages fetched in parallel
+MAX_DETAILS_PER_RUN = 300     # the backlog is worked off over several runs
+FLUSH_EVERY = 25              # records buffered before they are appended to the store
+GONE_STATUSES = {404, 410}    # stored too, so we never ask for them again
+
+POSTED_AGO_RE = re.compile(r"Posted\s+(\d+)\s+(minute|hour|day|week|month)s?\s+ago", re.I)
+VACANCIES_RE = re.compile(r"(\d+)\s+(?:open\s+positions?|vacanc(?:y|ies))", re.I)
+AGO_UNITS = {"minute": 1 / 1440, "hour": 1 / 24, "day": 1, "week": 7, "month": 30}
+
+
+def detail_url(job_url):
+    """Absolute URL of a posting (cards link to /jobs/p/...)."""
+    return urljoin(BASE_URL, job_url)
+
+
+def _as_date(value):
+    """'2026-01-15T10:00:00+02:00' -> '2026-01-15' (None if it doesn't look like a date)."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return datetime.date.fromisoformat(value.strip()[:10]).isoformat()
+    except ValueError:
+        return None
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _html_text(value):
+    if isinstance(value, dict):
+        value = " ".join(str(v) for v in value.values())
+    if not value:
+        return None
+    return BeautifulSoup(str(value), "html.parser").get_text(" ", strip=True) or None
+
+
+def _json_ld_posting(soup):
+    """The schema.org JobPosting object embedded for search engines, or {}."""
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        for item in data if isinstance(data, list) else [data]:
+            if isinstance(item, dict) and item.get("@type") == "JobPosting":
+                return item
+    return {}
+
+
+def _requirements_section(soup):
+    """Text under the "Job Requirements" heading."""
+    for heading in soup.find_all(["h2", "h3", "h4"]):
+        if "requirements" in heading.get_text().lower():
+            section = heading.find_next_sibling()
+            if section:
+                return section.get_text(" ", strip=True) or None
+    return None
+
+
+def parse_detail_page(content, fetched_on):
+    """
+    Extracts posted_date, valid_through (ISO dates), vacancies and requirements from a job page.
+    The JSON-LD JobPosting is read first; the visible text is the fallback. Missing fields are None.
+    """
+    soup = BeautifulSoup(content, scraper.FAST_PARSER)
+    posting = _json_ld_posting(soup)
+    record = {
+        "posted_date": _as_date(posting.get("datePosted")),
+        "valid_through": _as_date(posting.get("validThrough")),
+        "vacancies": _as_int(posting.get("totalJobOpenings")),
+        "requirements": _html_text(posting.get("qualifications") or posting.get("experienceRequirements")),
+    }
+
+    text = soup.get_text(" ", strip=True)
+    if record["posted_date"] is None:
+        match = POSTED_AGO_RE.search(text)
+        if match:
+            days = int(match.group(1)) * AGO_UNITS[match.group(2).lower()]
+            record["posted_date"] = (fetched_on - datetime.timedelta(days=int(days))).isoformat()
+    if record["vacancies"] is None:
+        match = VACANCIES_RE.search(text)
+        if match:
+            record["vacancies"] = int(match.group(1))
+    if record["requirements"] is None:
+        record["requirements"] = _requirements_section(soup)
+    return record
+
+
+def pending_job_urls(limit=MAX_DETAILS_PER_RUN):
+    """Job URLs in the history that have no detail record yet (oldest first, at most `limit`)."""
+    urls = storage.read_history(columns=["Job URL"])["Job URL"].dropna()
+    known = storage.job_detail_urls()
+    pending = [url for url in urls.unique() if url != "N/A" and url not in known]
+    return pending[:limit]
+
+
+def enrich_details(job_urls, session=None, limiter=None, max_workers=DETAIL_WORKERS):
+    """
+    Fetches the detail page of every job URL (bounded by max_workers and the shared rate limiter)
+    and appends the extracted fields to the details store. Returns the number of records stored.
+    Pages that fail after retries are not stored, so the next run tries them again.
+    """
+    session = session or scraper.make_session(max_workers)
+    limiter = limiter or scraper.AdaptiveRateLimiter(max_concurrency=max_workers)
+    lock = threading.Lock()
+    buffer = []
+    stored = 0
+
+    def flush():
+        nonlocal buffer, stored
+        storage.append_job_details(buffer)
+        stored += len(buffer)
+        buffer = []
+
+    def fetch_one(job_url):
+        status, content = scraper.fetch_page(session, detail_url(job_url), {}, scraper.HEADERS, limiter, cache_dir=None)
+        scraper.METRICS.inc("detail_pages_total", labels={"status": str(status)},
+                            help="Job detail pages fetched by status")
+        now = datetime.datetime.now()
+        record = {"job_url": job_url, "status": status, "fetched_at": now.isoformat(timespec="seconds")}
+        if status == 200:
+            try:
+                record.update(parse_detail_page(content, now.date()))
+            except Exception as e:
+                print(f"  Error parsing details of {job_url}: {e}")
+                return
+        elif status not in GONE_STATUSES:
+            print(f"  Could not fetch details of {job_url}: {status if status else content}")
+            return
+        with lock:
+            buffer.append(record)
+            if len(buffer) >= FLUSH_EVERY:
+                flush()
+
+    print(f"Fetching details of {len(job_urls)} jobs with {max_workers} workers...")
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(fetch_one, job_urls))
+    finally:
+        with lock:
+            flush()  # also creates the store on the first run
+    print(f"Stored details of {stored} jobs in {storage.JOB_DETAILS_PATH}")
+    return stored
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch job detail pages for postings that don't have them yet.")
+    parser.add_argument("--workers", type=int, default=DETAIL_WORKERS)
+    parser.add_argument("--limit", type=int, default=MAX_DETAILS_PER_RUN, help="Detail pages fetched in this run")
+    args = parser.parse_args()
+    scraper.METRICS.reset()
+    try:
+        enrich_details(pending_job_urls(args.limit), max_workers=args.workers)
+    finally:
+        scraper.METRICS.write("enrich")
@@ -0,0 +1,179 @@
+import heapq
+import json
+import threading
+import time
+
+# Queries, page budgets and priorities of the crawl (see README for the format)
+CRAWL_CONFIG_PATH = "crawl_config.json"
+
+# Used for anything the config file doesn't set
+DEFAULT_QUERY_SETTINGS = {
+    "priority": 1.0,      # higher = crawled first
+    "max_pages": 5,       # ~15 jobs per page
+    "min_pages": 2,       # pages crawled before the yield check kicks in
+    "min_new_rate": 0.1,  # stop a query once less than 10% of its postings are new
+}
+DEFAULT_BUDGET = {
+    "max_requests": None,  # page requests for the whole run (None = unlimited)
+    "max_seconds": None,   # wall-clock limit for the whole run
+}
+
+# The old hard-coded crawl, used when there's no config file
+DEFAULT_QUERIES = ["Data Analyst", "Machine Learning"]
+
+
+def load_crawl_config(path=CRAWL_CONFIG_PATH):
+    """
+    Reads the crawl config: {"defaults": {...}, "budget": {...}, "queries": [...]}.
+    A query is either a plain string or {"query": ..., "priority": ..., "max_pages": ...}.
+    Returns (list of per-query settings dicts, budget dict).
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        print(f"No crawl config at {path}, using the default queries.")
+        config = {"queries": DEFAULT_QUERIES}
+
+    defaults = dict(DEFAULT_QUERY_SETTINGS, **config.get("defaults", {}))
+    budget = dict(DEFAULT_BUDGET, **config.get("budget", {}))
+
+    queries = []
+    names = set()
+    for entry in config.get("queries", []):
+        if isinstance(entry, str):
+            entry = {"query": entry}
+        settings = dict(defaults, **entry)
+        name = settings["query"].strip()
+        if not name or name.lower() in names:
+            continue  # skip blanks and duplicate queries
+        names.add(name.lower())
+        settings["query"] = name
+        queries.append(settings)
+    return queries, budget
+
+
+class QueryState:
+    """Crawl progress of one query (pages are always crawled in order)."""
+    def __init__(self, index, settings, next_page=0, done=False):
+        self.index = index
+        self.query = settings["query"]
+        self.priority = float(settings["priority"])
+        self.max_pages = int(settings["max_pages"])
+        self.min_pages = int(settings["min_pages"])
+        self.min_new_rate = float(settings["min_new_rate"])
+        self.next_page = next_page
+        self.done = done or next_page >= self.max_pages
+        self.stop_reason = None
+        self.pages = 0
+        self.jobs_seen = 0
+        self.jobs_new = 0
+
+    def new_rate(self):
+        """Share of new postings on the pages crawled so far (smoothed, 1.0 before the first page)."""
+        return (self.jobs_new + 1) / (self.jobs_seen + 1)
+
+    def score(self):
+        # Configured priority, scaled down as the query stops finding new jobs
+        return self.priority * self.new_rate()
+
+
+class CrawlFrontier:
+    """
+    Thread-safe priority queue of (query, page) work items.
+
+    Every active query has at most one page in flight, so its pages stay in order
+    (needed for early stops and the checkpoint). Between queries, the highest
+    score (priority x recent new-job rate) goes first. A query leaves the frontier
+    when it hits its page budget, an empty / already-seen / failed page, or its
+    new-job rate drops below min_new_rate. The run ends when the frontier is
+    empty or the request / time budget is used up.
+    """
+    def __init__(self, states, max_requests=None, max_seconds=None):
+        self.states = states
+        self.max_requests = max_requests
+        self.deadline = time.monotonic() + max_seconds if max_seconds else None
+        self.requests = 0
+        self.in_flight = 0
+        self.heap = []
+        self.counter = 0  # tie-breaker: same score -> config order
+        self.cond = threading.Condition()
+        for state in states:
+            if not state.done:
+                self._push(state)
+
+    def _push(self, state):
+        heapq.heappush(self.heap, (-state.score(), state.index, self.counter, state))
+        self.counter += 1
+
+    def budget_left(self):
+        if self.max_requests is not None and self.requests >= self.max_requests:
+            return False
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return False
+        return True
+
+    def next_item(self):
+        """
+        Blocks until a work item is available and returns (state, page),
+        or None once the crawl is over (frontier empty or budget used up).
+        """
+        with self.cond:
+            while True:
+                if not self.budget_left():
+                    self.cond.notify_all()
+                    return None
+                if self.heap:
+                    _, _, _, state = heapq.heappop(self.heap)
+                    self.requests += 1
+                    self.in_flight += 1
+                    return state, state.next_page
+                if self.in_flight == 0:
+                    return None
+                # Other workers may still re-queue their query
+                self.cond.wait()
+
+    def update(self, state, page, jobs_seen, jobs_new, stop_reason=None):
+        """
+        Records the outcome of a crawled page and decides whether the query goes on.
+        The query stays in flight until release(). Returns True if the query is finished.
+        """
+        with self.cond:
+            state.pages += 1
+            state.jobs_seen += jobs_seen
+            state.jobs_new += jobs_new
+            # A failed page (after retries) stays the next page, so a rerun fetches it again
+            state.next_page = page if stop_reason == "error" else page + 1
+            if stop_reason is None:
+                if state.next_page >= state.max_pages:
+                    stop_reason = "max_pages"
+                elif state.pages >= state.min_pages and state.jobs_new < state.min_new_rate * state.jobs_seen:
+                    stop_reason = "low_yield"
+            if stop_reason:
+                state.done = True
+                state.stop_reason = stop_reason
+            return state.done
+
+    def release(self, state):
+        """Puts an unfinished query back in the queue (call after update(), even if the page failed)."""
+        with self.cond:
+            self.in_flight -= 1
+            if not state.done:
+                self._push(state)
+            self.cond.notify_all()
+
+    def wait_idle(self):
+        """Blocks until every handed-out work item has been released (pages still being parsed)."""
+        with self.cond:
+            while self.in_flight:
+                self.cond.wait()
+
+    def summary(self):
+        """Per-query results, for the end-of-run log."""
+        return [{
+            "query": s.query,
+            "pages": s.pages,
+            "jobs_seen": s.jobs_seen,
+            "jobs_new": s.jobs_new,
+            "stop_reason": s.stop_reason or ("budget" if not s.done else "resumed_done"),
+        } for s in self.states]
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Run reports are written here: <name>_run.json + <name>.prom (Prometheus textfile collector format)
+METRICS_DIR = "data/metrics"
+
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+COUNT_BUCKETS = [0, 1, 5, 10, 15, 20, 30, 50, 100]
+
+
+class Metrics:
+    """
+    Minimal thread-safe metrics registry for one run (counters, gauges, histograms with labels).
+    Exported as a JSON run report and as a Prometheus text-format file.
+    """
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counters = {}
+            self.gauges = {}
+            self.histograms = {}
+            self.help = {}
+            self.started = time.time()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name, value=1, labels=None, help=None):
+        with self.lock:
+            key = self._key(name, labels)
+            self.counters[key] = self.counters.get(key, 0) + value
+            if help:
+                self.help[name] = help
+
+    def set(self, name, value, labels=None, help=None):
+        with self.lock:
+            self.gauges[self._key(name, labels)] = value
+            if help:
+                self.help[name] = help
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, labels=None, help=None):
+        with self.lock:
+            key = self._key(name, labels)
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = {"buckets": list(buckets), "counts": [0] * len(buckets),
+                                               "sum": 0.0, "count": 0}
+            for i, bound in enumerate(hist["buckets"]):
+                if value <= bound:
+                    hist["counts"][i] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+            if help:
+                self.help[name] = help
+
+    @contextmanager
+    def timer(self, name, labels=None, help=None, histogram=True):
+        """Times the block: observed into a histogram (or set as a gauge with histogram=False)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if histogram:
+                self.observe(name, elapsed, labels=labels, help=help)
+            else:
+                self.set(name, elapsed, labels=labels, help=help)
+
+    # === Export ===
+    def report(self):
+        """JSON-friendly snapshot of everything recorded in this run."""
+        def fmt(key):
+            name, labels = key
+            return name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else "")
+
+        with self.lock:
+            return {
+                "namespace": self.namespace,
+                "started": self.started,
+                "duration_seconds": time.time() - self.started,
+                "counters": {fmt(k): v for k, v in sorted(self.counters.items())},
+                "gauges": {fmt(k): v for k, v in sorted(self.gauges.items())},
+                "histograms": {
+                    fmt(k): {
+                        "count": h["count"],
+                        "sum": h["sum"],
+                        "mean": h["sum"] / h["count"] if h["count"] else 0.0,
+                        "buckets": dict(zip(map(str, h["buckets"]), h["counts"])),
+                    } for k, h in sorted(self.histograms.items())
+                },
+            }
+
+    def prometheus_text(self):
+        """Prometheus text exposition format (for node exporter's textfile collector)."""
+        def labels_str(labels, extra=None):
+            items = list(labels) + (extra or [])
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}" if items else ""
+
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            full = f"{self.namespace}_{name}"
+            if full not in typed:
+                typed.add(full)
+                if name in self.help:
+                    lines.append(f"# HELP {full} {self.help[name]}")
+                lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                full = header(name, "counter")
+                lines.append(f"{full}{labels_str(labels)} {value}")
+            for (name, labels), value in sorted(self.gauges.items()):
+                full = header(name, "gauge")
+                lines.append(f"{full}{labels_str(labels)} {value}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                full = header(name, "histogram")
+                for bound, count in zip(h["buckets"], h["counts"]):
+                    lines.append(f"{full}_bucket{labels_str(labels, [('le', bound)])} {count}")
+                lines.append(f"{full}_bucket{labels_str(labels, [('le', '+Inf')])} {h['count']}")
+                lines.append(f"{full}_sum{labels_str(labels)} {h['sum']}")
+                lines.append(f"{full}_count{labels_str(labels)} {h['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, name, metrics_dir=METRICS_DIR):
+        """Writes <name>_run.json and <name>.prom (atomically, the exporter may read at any time)."""
+        os.makedirs(metrics_dir, exist_ok=True)
+        self.set("last_run_timestamp_seconds", time.time(), help="Unix time the last run finished")
+        self.set("run_duration_seconds", time.time() - self.started, help="Wall-clock time of the last run")
+
+        json_path = os.path.join(metrics_dir, f"{name}_run.json")
+        prom_path = os.path.join(metrics_dir, f"{name}.prom")
+        with open(json_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        os.replace(json_path + ".tmp", json_path)
+        with open(prom_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(prom_path + ".tmp", prom_path)
+        return json_path, prom_path
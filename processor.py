@@ -1,47 +1,411 @@
 import pandas as pd
+import numpy as np
 import os
+import json
+import hashlib
+import re
+import storage
+import queries
+import metrics
+import dedupe
+import search
+from aggregates import EXP_UNKNOWN, EXP_OPEN_ENDED, EXPERIENCE_BANDS, CUBE_DIMENSIONS, CUBE_PAIRS
 
-RAW_DATA_PATH = "data/wuzzuf_jobs_raw.csv"
-CLEAN_DATA_PATH = "data/wuzzuf_jobs_clean.csv"
+# Run metrics (written to data/metrics/processor_run.json + processor.prom after every refresh)
+METRICS = metrics.Metrics("wuzzuf_processor")
 
-def process_data():
+MANIFEST_PATH = os.path.join(storage.PUBLISH_DIR, "manifest.json")
+
+# Bump this whenever the cleaning logic below changes -> forces a full rebuild
+PROCESSOR_VERSION = 14
+
+# Low-cardinality columns stored as pandas categoricals (much smaller + faster groupbys)
+# (Job Title / Location / Years of Experience repeat a lot too: a few hundred distinct values per 10k rows)
+CATEGORICAL_COLUMNS = ["City", "Job Type", "Level", "Country", "Company Name", "Experience Band", "Hiring Speed",
+                       "Job Title", "Location", "Years of Experience"]
+# Mostly-unique text: one Arrow buffer per column instead of a Python object per row (missing stays <NA>)
+TEXT_COLUMNS = ["Skills", "Job URL", "Requirements"]
+
+# Columns that come from the job detail pages (storage.JOB_DETAILS_PATH) + what we derive from them
+DETAIL_COLUMNS = list(storage.DETAIL_FIELDS.values()) + ["Listing Days", "Hiring Speed"]
+
+# "2 - 3 Yrs of Exp" -> Exp Min 2, Exp Max 3; "5+ Yrs of Exp" -> 5, EXP_OPEN_ENDED; no match -> EXP_UNKNOWN
+EXPERIENCE_RE = re.compile(r"(\d+)\s*(?:-\s*(\d+)|(\+))?\s*(?:Yrs?|Years?)", re.IGNORECASE)
+
+
+def _file_hash(path):
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def fingerprint_inputs(paths, previous=None):
     """
-    Reads raw data, cleans it, filters for Egypt only, and saves to clean CSV.
-    Returns the cleaned DataFrame.
+    Fingerprint (size, mtime, content hash) of every raw part file.
+    The hash is only recomputed when size/mtime differ from the previous manifest,
+    so unchanged inputs cost one stat() each.
     """
-    if not os.path.exists(RAW_DATA_PATH):
-        print(f"Error: {RAW_DATA_PATH} not found.")
-        return pd.DataFrame()
+    previous = previous or {}
+    files = {}
+    for path in paths:
+        stat = os.stat(path)
+        old = previous.get(path)
+        if old and old["size"] == stat.st_size and old["mtime"] == stat.st_mtime:
+            content_hash = old["sha1"]
+        else:
+            content_hash = _file_hash(path)
+        files[path] = {"size": stat.st_size, "mtime": stat.st_mtime, "sha1": content_hash}
+    return files
+
 
+def load_manifest(path=MANIFEST_PATH):
     try:
-        # 1. Load Raw Data
-        df = pd.read_csv(RAW_DATA_PATH)
-        
-        # 2. Basic Cleaning (Missing Values)
-        df['Job Title'] = df['Job Title'].fillna("Unknown")
-        df['Company Name'] = df['Company Name'].fillna("Unknown")
-        df['Location'] = df['Location'].fillna("Unknown")
-        df['Skills'] = df['Skills'].fillna("")
-        df['Job Type'] = df['Job Type'].fillna("Unknown")
-        df['Level'] = df['Level'].fillna("Unknown")
-
-        # 3. Extract City (First part of location)
-        # e.g. "Maadi, Cairo, Egypt" -> "Maadi"
-        df['City'] = df['Location'].apply(lambda x: x.split(',')[0].strip() if isinstance(x, str) else x)
-
-        # 4. FILTER: Egypt Only
-        # We explicitly remove jobs that don't satisfy the Egypt location requirement
-        df = df[df['Location'].str.contains("Egypt", case=False, na=False)]
-
-        # 5. Save to Clean CSV
-        df.to_csv(CLEAN_DATA_PATH, index=False)
-        print(f"Data processed successfully. Saved {len(df)} rows to {CLEAN_DATA_PATH}")
-        
-        return df
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def parse_experience(values):
+    """
+    Parses a Series of "Years of Experience" strings into int8 (Exp Min, Exp Max) Series.
+    The regex runs once per distinct string (there are only a few dozen), the result is
+    broadcast back through the factorized codes. Unparseable / missing -> EXP_UNKNOWN.
+    """
+    codes, uniques = pd.factorize(values.astype(str), sort=False)
+    parts = pd.Series(uniques, dtype="object").str.extract(EXPERIENCE_RE)
+    low = pd.to_numeric(parts[0], errors="coerce")
+    high = pd.to_numeric(parts[1], errors="coerce")
+    high = high.where(parts[2].isna(), EXP_OPEN_ENDED).fillna(low)  # "5+" -> open ended, "3 Yrs" -> 3
+    low = low.clip(upper=EXP_OPEN_ENDED).fillna(EXP_UNKNOWN).to_numpy("int8")
+    high = high.clip(upper=EXP_OPEN_ENDED).fillna(EXP_UNKNOWN).to_numpy("int8")
+    return (pd.Series(low[codes], index=values.index, dtype="int8"),
+            pd.Series(high[codes], index=values.index, dtype="int8"))
+
+
+def experience_band(exp_min):
+    """Band label (EXPERIENCE_BANDS) of each Exp Min value, "Unknown" for EXP_UNKNOWN."""
+    conditions = [(exp_min >= low) & (exp_min <= high) for low, high in EXPERIENCE_BANDS.values()]
+    return pd.Series(np.select(conditions, list(EXPERIENCE_BANDS), default="Unknown"), index=exp_min.index)
+
+
+def clean_raw(df):
+    """Cleaning steps applied to raw rows (missing values, City, Egypt filter, experience range). Vectorized."""
+    # Basic Cleaning (Missing Values)
+    df = df.fillna({
+        'Job Title': "Unknown",
+        'Company Name': "Unknown",
+        'Location': "Unknown",
+        'Skills': "",
+        'Job Type': "Unknown",
+        'Level': "Unknown",
+    })
+
+    # FILTER: Egypt Only
+    # We explicitly remove jobs that don't satisfy the Egypt location requirement
+    rows_before = len(df)
+    df = df[df['Location'].str.contains("Egypt", case=False, na=False, regex=False)].copy()
+    METRICS.inc("rows_dropped_egypt_filter_total", rows_before - len(df),
+                help="Raw rows removed by the Egypt-only filter")
+
+    # Extract City (First part of location)
+    # e.g. "Maadi, Cairo, Egypt" -> "Maadi"
+    df['City'] = df['Location'].str.split(',', n=1).str[0].str.strip()
+
+    # Numeric experience range (fast range filters / sorting instead of string matching)
+    df['Exp Min'], df['Exp Max'] = parse_experience(df['Years of Experience'])
+    df['Experience Band'] = experience_band(df['Exp Min'])
+    # Partition column of the history store: one Python date object per row, and the same
+    # day is already in Scraped At, so it's not kept in the clean data
+    return df.drop(columns=['date'], errors='ignore')
+
+
+def classify_hiring_speed(days):
+    """Hiring-speed bucket for a Series of listing durations in days ("Unknown" where missing)."""
+    days = pd.to_numeric(days, errors="coerce").astype("float64")  # <NA> -> NaN, compares as False
+    labels = np.select(
+        [days < 10, days <= 30, days > 30],
+        ["Urgent Hiring (<10 Days)", "Moderate Hiring (10-30 Days)", "Slow Hiring (>30 Days)"],
+        default="Unknown")
+    return pd.Series(labels, index=days.index)
+
+
+def merge_details(df, details):
+    """
+    Joins the job detail fields (Posted Date, Valid Through, Vacancies, Requirements) on Job URL
+    and derives Listing Days (posting -> application deadline) and Hiring Speed from them.
+    Detail pages are fetched once, so the advertised listing window is our time-to-fill measure.
+    """
+    df = df.drop(columns=[c for c in DETAIL_COLUMNS if c in df.columns])
+    if "Job URL" in df.columns:
+        df = df.merge(details, on="Job URL", how="left")
+    else:
+        df = df.assign(**{c: None for c in details.columns if c != "Job URL"})
+    df['Posted Date'] = pd.to_datetime(df['Posted Date'], errors="coerce")
+    df['Valid Through'] = pd.to_datetime(df['Valid Through'], errors="coerce")
+    df['Vacancies'] = pd.to_numeric(df['Vacancies'], errors="coerce").astype("Int16")
+    df['Listing Days'] = (df['Valid Through'] - df['Posted Date']).dt.days.astype("Int16")
+    df['Hiring Speed'] = classify_hiring_speed(df['Listing Days'])
+    return df
+
+
+def to_categoricals(df):
+    """
+    Converts the low-cardinality columns to categoricals (only categories actually present)
+    and the remaining free-text columns to Arrow-backed strings.
+    """
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(str).astype("category")
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("string[pyarrow]")
+    return df
+
+
+def build_skills_tables(df):
+    """
+    Splits the comma-joined Skills column once into a long job-skill table.
+    Skills are interned into integer ids:
+      skills     -> Skill ID, Skill, Count (number of unique postings), sorted by Count desc
+      job_skills -> Job ID, Skill ID
+    """
+    exploded = df['Skills'].astype(str).str.split(',').explode().str.strip()
+    exploded = exploded[exploded.ne("") & exploded.ne("nan")]
+    job_ids = df['Job ID'].to_numpy()[df.index.get_indexer(exploded.index)]
+
+    codes, names = pd.factorize(exploded, sort=False)
+    job_skills = pd.DataFrame({"Job ID": job_ids.astype("int32"), "Skill ID": codes.astype("int32")})
+    job_skills = job_skills.drop_duplicates(ignore_index=True)
+
+    # Count each near-duplicate cluster once (its first row stands for the whole cluster)
+    counted = job_skills
+    if 'Cluster ID' in df.columns:
+        first_rows = (df['Cluster ID'] == df['Job ID']).to_numpy()  # indexed by Job ID (= row position)
+        counted = job_skills[first_rows[job_skills["Job ID"].to_numpy()]]
+    counts = np.bincount(counted["Skill ID"].to_numpy(), minlength=len(names))
+    skills = pd.DataFrame({
+        "Skill ID": np.arange(len(names), dtype="int32"),
+        "Skill": names,
+        "Count": counts,
+    }).sort_values(["Count", "Skill"], ascending=[False, True], ignore_index=True)
+    return skills, job_skills
+
+
+def build_aggregate_cube(df):
+    """
+    Precomputes the counts the dashboard shows, in one long table:
+      Dimension ("City" or "City|Level"), Value, Value 2 ("" for single dimensions), Count
+    Sorted by Count desc (ties alphabetical) within each dimension.
+    Counts are unique postings: near-duplicates (same Cluster ID) are counted once.
+    """
+    if 'Cluster ID' in df.columns and 'Job ID' in df.columns:
+        df = df[df['Cluster ID'] == df['Job ID']]
+    frames = []
+    for dims in [(d,) for d in CUBE_DIMENSIONS] + CUBE_PAIRS:
+        if not all(d in df.columns for d in dims):
+            continue
+        values = df[list(dims)].astype(str).replace("nan", "Unknown")
+        counts = values.value_counts(sort=False).reset_index(name="Count")
+        frames.append(pd.DataFrame({
+            "Dimension": "|".join(dims),
+            "Value": counts[dims[0]],
+            "Value 2": counts[dims[1]] if len(dims) > 1 else "",
+            "Count": counts["Count"].astype("int64"),
+        }).sort_values(["Count", "Value", "Value 2"], ascending=[False, True, True]))
+    if not frames:
+        return pd.DataFrame(columns=["Dimension", "Value", "Value 2", "Count"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def job_ids_for_skills(job_skills, skill_ids):
+    """Job IDs that have any of the given skill ids (integer join, no string splitting)."""
+    return job_skills.loc[job_skills["Skill ID"].isin(skill_ids), "Job ID"].unique()
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def compute_data_version(files, date_range):
+    """Token identifying a processed dataset: processor version + content of every input file."""
+    key = json.dumps([PROCESSOR_VERSION, date_range, sorted(fp["sha1"] for fp in files.values())])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def refresh_artifacts(start_date=None, end_date=None, force=False):
+    """
+    Brings the published artifacts (clean data, skills tables, aggregate cube)
+    in line with the raw history and returns the current data version.
+    Stage timings and row counts are written to data/metrics/ after every call.
+
+    Incremental: a manifest records the fingerprint of every input file and the
+    processor version. If nothing changed this is a no-op (a stat() per file);
+    if new part files were added only those are cleaned and merged in.
+    New artifacts are published as a new version in one atomic swap (see storage.publish).
+
+    Only one process refreshes at a time (storage.acquire_lock): if another one holds the
+    lock, this call does nothing and returns the version currently published.
+    """
+    if not storage.acquire_lock():
+        print("Another process is refreshing the data. Using the published version.")
+        return storage.current_version()
+    METRICS.reset()
+    try:
+        with METRICS.timer("stage_seconds", labels={"stage": "total"}, histogram=False):
+            return _refresh_artifacts(start_date, end_date, force)
+    finally:
+        METRICS.write("processor")
+        storage.release_lock()
+
+
+def _stage(name):
+    return METRICS.timer("stage_seconds", labels={"stage": name}, histogram=False,
+                         help="Duration of each ETL stage in the last run")
+
+
+def _refresh_artifacts(start_date, end_date, force):
+    # Old installs: move the legacy raw CSV into the history store once
+    storage.import_legacy_csv()
+
+    # 1. Fingerprint the inputs (only the partitions in the requested date range)
+    paths = storage.list_parts(start_date, end_date)
+    if not paths:
+        print(f"Error: no raw data found in {storage.HISTORY_DIR}.")
+        return None
+
+    date_range = [str(start_date), str(end_date)]
+    manifest = None if force else load_manifest()
+    same_logic = (
+        manifest is not None
+        and manifest.get("version") == PROCESSOR_VERSION
+        and manifest.get("range") == date_range
+        and manifest.get("data_version") == storage.current_version()
+        and os.path.isdir(os.path.join(storage.PUBLISH_DIR, manifest.get("data_version") or ""))
+    )
+    previous_files = manifest["files"] if same_logic else {}
+    previous_details = manifest.get("details", {}) if same_logic else {}
+    with _stage("fingerprint"):
+        files = fingerprint_inputs(paths, previous_files)
+        detail_paths = [storage.JOB_DETAILS_PATH] if os.path.exists(storage.JOB_DETAILS_PATH) else []
+        detail_files = fingerprint_inputs(detail_paths, previous_details)
+
+    # 2. Decide what needs to be done
+    unchanged = {p for p, fp in files.items() if previous_files.get(p, {}).get("sha1") == fp["sha1"]}
+    removed_or_changed = set(previous_files) - unchanged
+    new_paths = [p for p in paths if p not in unchanged]
+    # New detail records only need a re-join, the raw rows don't have to be cleaned again
+    details_changed = detail_files != previous_details
+
+    if same_logic and not removed_or_changed and not new_paths and not details_changed:
+        # Nothing changed: no work at all
+        if files != previous_files:
+            # Only mtimes moved (e.g. fresh checkout) -> refresh the manifest
+            save_manifest(dict(manifest, files=files))
+        print("Data unchanged since last run. Using published data.")
+        METRICS.inc("runs_total", labels={"mode": "noop"}, help="Processor runs by mode")
+        return manifest["data_version"]
+
+    if same_logic and not removed_or_changed:
+        # Append-only change: clean only the new part files and merge them in
+        METRICS.inc("runs_total", labels={"mode": "incremental"}, help="Processor runs by mode")
+        with _stage("load"):
+            raw = storage.read_parts(new_paths) if new_paths else pd.DataFrame()
+            # Categories differ between the two frames -> concat as strings, re-encode below
+            old_rows = storage.read_clean()
+            for col in CATEGORICAL_COLUMNS:
+                if col in old_rows.columns:
+                    old_rows[col] = old_rows[col].astype(str)
+        with _stage("clean"):
+            if new_paths:
+                new_rows = clean_raw(raw)
+                df = pd.concat([old_rows, new_rows], ignore_index=True)
+            else:
+                new_rows, df = raw, old_rows
+        print(f"Incremental update: cleaned {len(new_rows)} new rows from {len(new_paths)} file(s).")
+    else:
+        # Full rebuild (first run, processor changed, or history rewritten)
+        METRICS.inc("runs_total", labels={"mode": "full"}, help="Processor runs by mode")
+        with _stage("load"):
+            raw = storage.read_parts(paths)
+        with _stage("clean"):
+            df = clean_raw(raw)
+    METRICS.set("rows_raw_processed", len(raw), help="Raw rows cleaned in the last run")
+
+    with _stage("details"):
+        df = merge_details(df, storage.read_job_details())
+    METRICS.set("rows_with_details", int(df['Posted Date'].notna().sum()),
+                help="Clean rows with a posting date from the detail pages")
+
+    with _stage("categoricals"):
+        before_mb = memory_mb(df)
+        df = to_categoricals(df)
+        after_mb = memory_mb(df)
+    print(f"Memory: {before_mb:.2f} MB (object columns) -> {after_mb:.2f} MB (categoricals + Arrow strings), "
+          f"{before_mb / max(after_mb, 1e-9):.1f}x smaller")
+    METRICS.set("clean_memory_bytes", after_mb * 1024 * 1024, help="In-memory size of the clean DataFrame")
+
+    # Row id used by the derived tables (skills, ...)
+    df = df.reset_index(drop=True)
+    df['Job ID'] = np.arange(len(df), dtype="int32")
+    METRICS.set("rows_clean", len(df), help="Rows in the published clean dataset")
+    with _stage("dedupe"):
+        # Near-duplicate postings (same job under several queries) share a Cluster ID
+        df['Cluster ID'] = dedupe.cluster_ids(df)
+    METRICS.set("unique_postings", int(df['Cluster ID'].nunique()),
+                help="Clean rows after merging near-duplicate postings")
+    with _stage("skills"):
+        skills, job_skills = build_skills_tables(df)
+    with _stage("aggregates"):
+        cube = build_aggregate_cube(df)
+    with _stage("search_index"):
+        # Details page search postings: the app only memory-maps them
+        search_texts, search_trigrams, search_tokens = search.build_search_tables(df)
+
+    # 3. Publish clean data + derived tables (+ SQLite copy) as one version, then the manifest describing them
+    data_version = compute_data_version({**files, **detail_files}, date_range)
+    with _stage("publish"):
+        storage.publish({
+            storage.CLEAN_DATA_FILE: df,
+            storage.CLEAN_SNAPSHOT_FILE: df,
+            storage.SKILLS_FILE: skills,
+            storage.JOB_SKILLS_FILE: job_skills,
+            storage.AGGREGATES_FILE: cube,
+            storage.SEARCH_TEXTS_FILE: search_texts,
+            storage.SEARCH_TRIGRAMS_FILE: search_trigrams,
+            storage.SEARCH_TOKENS_FILE: search_tokens,
+            storage.DATABASE_FILE: lambda path: queries.build_database(path, df, skills, job_skills),
+        }, data_version)
+    save_manifest({"version": PROCESSOR_VERSION, "range": date_range, "data_version": data_version,
+                   "files": files, "details": detail_files})
+    print(f"Data processed successfully. Published {len(df)} rows as version {data_version}")
+    return data_version
+
+
+def process_data(start_date=None, end_date=None, force=False):
+    """
+    Runs the ETL (see refresh_artifacts) and returns the cleaned DataFrame.
+    The dashboard doesn't call this; it only reads the published artifacts.
+    """
+    try:
+        data_version = refresh_artifacts(start_date, end_date, force)
+        if data_version is None:
+            return pd.DataFrame()
+        return storage.read_clean(version=data_version)
         
     except Exception as e:
         print(f"Error during data processing: {e}")
         return pd.DataFrame()
 
 if __name__ == "__main__":
-    process_data()
+    # Refresh only (the app's background refresher runs this as a subprocess)
+    refresh_artifacts()
@@ -0,0 +1,155 @@
+import sqlite3
+
+import pandas as pd
+
+import storage
+
+# Clean-data columns stored in the jobs table (display name -> SQL column)
+JOB_COLUMNS = {
+    "Job ID": "job_id",
+    "Job Title": "title",
+    "Company Name": "company",
+    "Location": "location",
+    "City": "city",
+    "Job Type": "job_type",
+    "Level": "level",
+    "Years of Experience": "years_exp",
+    "Exp Min": "exp_min",
+    "Exp Max": "exp_max",
+    "Skills": "skills",
+    "Country": "country",
+    "Job URL": "job_url",
+    "Posted Date": "posted_date",
+    "Vacancies": "vacancies",
+    "Hiring Speed": "hiring_speed",
+    "Cluster ID": "cluster_id",
+}
+
+# Columns the app can filter on (all indexed)
+FILTER_COLUMNS = {
+    "City": "city",
+    "Company Name": "company",
+    "Level": "level",
+    "Job Type": "job_type",
+}
+
+
+def build_database(path, df, skills, job_skills):
+    """
+    Writes the clean data + skills tables into a SQLite file with indexes on
+    city, company, level, job type, experience range and skill. Called by the processor when publishing.
+    """
+    columns = [c for c in JOB_COLUMNS if c in df.columns]
+    jobs = df[columns].rename(columns=JOB_COLUMNS)
+    # Categoricals -> plain strings for SQLite
+    for col in jobs.columns:
+        if isinstance(jobs[col].dtype, pd.CategoricalDtype):
+            jobs[col] = jobs[col].astype(str)
+
+    conn = sqlite3.connect(path)
+    try:
+        jobs.to_sql("jobs", conn, index=False)
+        skills.rename(columns={"Skill ID": "skill_id", "Skill": "skill", "Count": "count"}).to_sql(
+            "skills", conn, index=False)
+        job_skills.rename(columns={"Job ID": "job_id", "Skill ID": "skill_id"}).to_sql(
+            "job_skills", conn, index=False)
+
+        conn.executescript("""
+            CREATE UNIQUE INDEX idx_jobs_id ON jobs(job_id);
+            CREATE INDEX idx_jobs_city ON jobs(city);
+            CREATE INDEX idx_jobs_company ON jobs(company);
+            CREATE INDEX idx_jobs_level ON jobs(level);
+            CREATE INDEX idx_jobs_job_type ON jobs(job_type);
+            CREATE INDEX idx_jobs_exp ON jobs(exp_min, exp_max);
+            CREATE INDEX idx_jobs_cluster ON jobs(cluster_id);
+            CREATE UNIQUE INDEX idx_skills_id ON skills(skill_id);
+            CREATE INDEX idx_skills_name ON skills(skill);
+            CREATE INDEX idx_job_skills_skill ON job_skills(skill_id, job_id);
+            ANALYZE;
+        """)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def connect(data_version=None):
+    """Read-only connection to the database of a published data version (None if not built)."""
+    path = storage.artifact_path(storage.DATABASE_FILE, data_version)
+    if path is None:
+        return None
+    try:
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    except sqlite3.OperationalError:
+        return None
+
+
+def _where(filters=None, skill=None, job_ids=None, experience=None):
+    """
+    Builds the WHERE clause + params for the given filters.
+    experience=(low, high) keeps jobs whose experience range overlaps it (unknown ranges excluded).
+    """
+    clauses = []
+    params = []
+    for name, value in (filters or {}).items():
+        if value is None:
+            continue
+        clauses.append(f"{FILTER_COLUMNS[name]} = ?")
+        params.append(value)
+    if experience is not None:
+        clauses.append("exp_min >= 0 AND exp_min <= ? AND exp_max >= ?")
+        params.extend([int(experience[1]), int(experience[0])])
+    if skill:
+        clauses.append(
+            "job_id IN (SELECT js.job_id FROM job_skills js JOIN skills s ON s.skill_id = js.skill_id WHERE s.skill = ?)")
+        params.append(skill)
+    if job_ids is not None:
+        clauses.append(f"job_id IN ({','.join('?' * len(job_ids))})" if len(job_ids) else "0")
+        params.extend(int(i) for i in job_ids)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def count_jobs(conn, filters=None, skill=None, experience=None):
+    """Number of jobs matching the filters (uses the indexes, no row data is loaded)."""
+    where, params = _where(filters, skill, experience=experience)
+    return conn.execute(f"SELECT COUNT(*) FROM jobs{where}", params).fetchone()[0]
+
+
+def count_postings(conn, filters=None, skill=None, experience=None):
+    """Number of unique postings (near-duplicate clusters) matching the filters."""
+    where, params = _where(filters, skill, experience=experience)
+    return conn.execute(f"SELECT COUNT(DISTINCT cluster_id) FROM jobs{where}", params).fetchone()[0]
+
+
+def matching_ids(conn, filters=None, skill=None, experience=None):
+    """Job IDs matching the filters, ascending."""
+    where, params = _where(filters, skill, experience=experience)
+    return [row[0] for row in conn.execute(f"SELECT job_id FROM jobs{where} ORDER BY job_id", params)]
+
+
+def fetch_jobs(conn, filters=None, skill=None, job_ids=None, limit=100, offset=0, experience=None):
+    """
+    One page of jobs matching the filters, as a DataFrame with the display column names.
+    job_ids (optional) restricts the result to these ids, e.g. a page of search hits.
+    """
+    where, params = _where(filters, skill, job_ids, experience)
+    query = f"SELECT * FROM jobs{where} ORDER BY job_id LIMIT ? OFFSET ?"
+    df = pd.read_sql_query(query, conn, params=params + [limit, offset])
+    return df.rename(columns={v: k for k, v in JOB_COLUMNS.items()})
+
+
+def fetch_columns(conn, names):
+    """Selected columns of every job (ordered by Job ID), e.g. to build the search index."""
+    columns = ", ".join(JOB_COLUMNS[name] for name in names)
+    df = pd.read_sql_query(f"SELECT {columns} FROM jobs ORDER BY job_id", conn)
+    return df.rename(columns={v: k for k, v in JOB_COLUMNS.items()})
+
+
+def distinct_values(conn, name):
+    """Sorted distinct values of a filter column (served from its index)."""
+    column = FILTER_COLUMNS[name]
+    return [row[0] for row in conn.execute(f"SELECT DISTINCT {column} FROM jobs ORDER BY {column}")]
+
+
+def skill_names(conn):
+    """All skills, most common first."""
+    return [row[0] for row in conn.execute("SELECT skill FROM skills ORDER BY count DESC, skill")]
@@ -0,0 +1,101 @@
+import argparse
+import datetime
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import archive
+import scraper
+import storage
+
+# Offline re-extraction: runs the current parser over archived pages (no network) and
+# writes the result as a history store of its own, in the same layout as data/history.
+# Compare it with the live history, then swap it in if the new parsing rules are right.
+REPLAY_HISTORY_DIR = "data/replay/history"
+REPLAY_WORKERS = os.cpu_count() or 2
+BATCH_SIZE = 64  # pages per task sent to a worker process
+
+
+def _extract_batch(entries, archive_dir):
+    """Worker: loads + parses a batch of archived pages. Returns [(entry, jobs, stats)]."""
+    results = []
+    for entry in entries:
+        try:
+            jobs, stats = scraper.parse_page(archive.load_page(entry, archive_dir))
+        except Exception as e:
+            jobs, stats = [], {"error": str(e)}
+        results.append((entry, jobs, stats))
+    return results
+
+
+def replay(start_date=None, end_date=None, queries=None, workers=REPLAY_WORKERS,
+           archive_dir=archive.ARCHIVE_DIR, history_dir=REPLAY_HISTORY_DIR):
+    """
+    Re-extracts jobs from the archived pages of a date range into `history_dir`.
+    Jobs are deduped like a live run: a posting is kept the first time it was seen,
+    in the partition of the day it was fetched. Returns a summary dict.
+    """
+    entries = archive.read_index(archive_dir, start_date, end_date, queries)
+    if not entries:
+        print(f"No archived pages in {archive_dir} for that range.")
+        return {"pages": 0}
+    if os.path.exists(history_dir):
+        print(f"Replacing the previous replay output in {history_dir}")
+        shutil.rmtree(history_dir)
+
+    start = time.perf_counter()
+    batches = [entries[i:i + BATCH_SIZE] for i in range(0, len(entries), BATCH_SIZE)]
+    seen = set()
+    by_day = {}
+    summary = {"pages": 0, "cards": 0, "fallback_pages": 0, "empty_pages": 0, "errors": 0, "jobs": 0}
+    print(f"Replaying {len(entries)} archived pages with {workers} worker processes...")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() keeps archive order, so "first seen" matches the order of the live runs
+        for results in executor.map(_extract_batch, batches, [archive_dir] * len(batches)):
+            for entry, jobs, stats in results:
+                summary["pages"] += 1
+                if "error" in stats:
+                    summary["errors"] += 1
+                    continue
+                summary["cards"] += stats["cards"]
+                summary["fallback_pages"] += int(stats["fallback"])
+                summary["empty_pages"] += int(not jobs)
+                for job in jobs:
+                    fp = scraper.job_fingerprint(job)
+                    if fp in seen:
+                        continue
+                    seen.add(fp)
+                    job["Scraped At"] = entry["fetched_at"]
+                    by_day.setdefault(entry["fetched_at"][:10], []).append(job)
+
+    for day, jobs in sorted(by_day.items()):
+        df = pd.DataFrame(jobs)
+        scraped_at = pd.to_datetime(df.pop("Scraped At"))
+        # One part per day; Scraped At is the time of the first page of that day
+        storage.write_snapshot(df, scraped_at=scraped_at.min(), history_dir=history_dir,
+                               part_name=f"part-replay-{day}.parquet")
+        summary["jobs"] += len(df)
+
+    summary["seconds"] = round(time.perf_counter() - start, 2)
+    print(f"Replayed {summary['pages']} pages ({summary['cards']} cards, {summary['fallback_pages']} fallback, "
+          f"{summary['empty_pages']} empty, {summary['errors']} errors) -> {summary['jobs']} unique jobs "
+          f"in {history_dir} ({summary['seconds']}s)")
+    return summary
+
+
+def _date(value):
+    return datetime.date.fromisoformat(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-extract jobs from the raw HTML archive (offline).")
+    parser.add_argument("--start", type=_date, help="First fetch date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=_date, help="Last fetch date (YYYY-MM-DD)")
+    parser.add_argument("--query", action="append", dest="queries", help="Only these queries (repeatable)")
+    parser.add_argument("--workers", type=int, default=REPLAY_WORKERS)
+    parser.add_argument("--out", default=REPLAY_HISTORY_DIR, help="History directory to write")
+    args = parser.parse_args()
+    replay(args.start, args.end, args.queries, args.workers, history_dir=args.out)
@@ -0,0 +1,221 @@
+import argparse
+import datetime
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+import frontier
+import processor
+import storage
+
+# Static per-segment reports: the numbers of the Dashboard (KPIs, top companies / titles,
+# skills, experience, levels, job types) for every city, level, job type and crawl query,
+# written as one JSON file and one HTML page per data version:
+#   data/reports/<data_version>/report.json
+#   data/reports/<data_version>/report.html
+#
+# The clean data is read once from the published snapshot and split into segments with
+# one groupby per dimension, so every row is handed out once per dimension and the total
+# work grows with the data, not with the number of segments. The segments are then
+# summarized in parallel worker processes with the processor's own cube / skills builders
+# and the dashboard's cube lookups (aggregates.py).
+REPORTS_DIR = "data/reports"
+REPORT_WORKERS = os.cpu_count() or 2
+SEGMENT_DIMENSIONS = ["City", "Level", "Job Type", "Query"]
+MIN_SEGMENT_POSTINGS = 10   # smaller segments are left out of the report
+TOP_N = 10                  # companies / titles per segment (as on the Dashboard)
+TOP_SKILLS = 15
+TOP_CITIES = 7
+
+# Columns the summaries need (Cluster ID only to count near-duplicates once)
+REPORT_COLUMNS = ["Job ID", "Cluster ID", "Job Title", "Company Name", "City", "Job Type", "Level",
+                  "Years of Experience", "Experience Band", "Hiring Speed", "Skills"]
+
+
+def load_report_data(version=None):
+    """Clean data of `version` (the mapped Arrow snapshot if there is one, else the Parquet file)."""
+    snapshot = storage.read_arrow(storage.CLEAN_SNAPSHOT_FILE, version)
+    if snapshot is not None:
+        columns = [c for c in REPORT_COLUMNS if c in snapshot.column_names]
+        return snapshot.select(columns).to_pandas()
+    df = storage.read_clean(version=version)
+    return df[[c for c in REPORT_COLUMNS if c in df.columns]]
+
+
+def query_segments(titles, query_names):
+    """
+    Row positions of the postings matching each crawl query (query text found in the Job Title).
+    The search query isn't stored with a posting, so the title match stands in for it.
+    Titles are matched once per distinct title, then expanded with one groupby.
+    """
+    codes, uniques = pd.factorize(titles.astype(str).str.lower())
+    rows_by_code = pd.Series(range(len(codes))).groupby(codes).indices
+    segments = {}
+    for name in query_names:
+        matching = [code for code, title in enumerate(uniques) if name.lower() in title]
+        if matching:
+            segments[name] = np.sort(np.concatenate([rows_by_code[code] for code in matching]))
+    return segments
+
+
+def split_segments(df, dimensions, query_names, min_postings=MIN_SEGMENT_POSTINGS):
+    """
+    [(dimension, value, row positions)] for every segment, overall data first.
+    Segments with fewer than min_postings unique postings are skipped.
+    """
+    segments = [("All", "All postings", None)]
+    first_rows = (df['Cluster ID'] == df['Job ID']).to_numpy() if 'Cluster ID' in df.columns else None
+    for dimension in dimensions:
+        if dimension == "Query":
+            groups = query_segments(df['Job Title'], query_names)
+        elif dimension in df.columns:
+            groups = df.groupby(dimension, observed=True, sort=True).indices
+        else:
+            print(f"  No '{dimension}' column in the clean data, skipping it.")
+            continue
+        for value, positions in groups.items():
+            unique = first_rows[positions].sum() if first_rows is not None else len(positions)
+            if unique >= min_postings:
+                segments.append((dimension, str(value), positions))
+    return segments
+
+
+def _records(frame):
+    return frame.to_dict(orient="records")
+
+
+def segment_summary(rows):
+    """
+    Dashboard numbers of one segment, using the same cube / skills tables the app reads.
+    `rows` are all listings of the segment (near-duplicates included).
+    """
+    cube = processor.build_aggregate_cube(rows)
+    # Skills are counted on unique postings only (cluster first rows), as in the processor
+    unique_rows = rows[rows['Cluster ID'] == rows['Job ID']] if 'Cluster ID' in rows.columns else rows
+    skills, _ = processor.build_skills_tables(unique_rows.drop(columns=['Cluster ID'], errors='ignore')
+                                              .reset_index(drop=True))
+    skills = skills[skills['Count'] > 0]
+    return {
+        "kpis": {
+            "listings": int(len(rows)),
+            "unique_postings": int(len(unique_rows)),
+            "top_city": aggregates.cube_top(cube, 'City'),
+            "top_company": aggregates.cube_top(cube, 'Company Name'),
+            "top_skill": skills['Skill'].iloc[0] if not skills.empty else "N/A",
+        },
+        "top_companies": _records(aggregates.cube_counts(cube, 'Company Name', 'Company', top=TOP_N)),
+        "top_titles": _records(aggregates.cube_counts(cube, 'Job Title', 'Title', top=TOP_N)),
+        "top_cities": _records(aggregates.cube_counts(cube, 'City', 'City', top=TOP_CITIES)),
+        "top_skills": _records(skills[['Skill', 'Count']].head(TOP_SKILLS)),
+        "experience": _records(aggregates.experience_counts(cube)),
+        "levels": _records(aggregates.cube_counts(cube, 'Level', 'Level')),
+        "job_types": _records(aggregates.cube_counts(cube, 'Job Type', 'Type')),
+        "hiring_speed": _records(aggregates.cube_counts(cube, 'Hiring Speed', 'Speed')),
+    }
+
+
+def _summarize(task):
+    """Worker: (dimension, value, rows) -> report entry."""
+    dimension, value, rows = task
+    entry = {"dimension": dimension, "value": value}
+    entry.update(segment_summary(rows))
+    return entry
+
+
+def _table(title, records):
+    if not records:
+        return ""
+    return f"<h3>{html.escape(title)}</h3>" + pd.DataFrame(records).to_html(index=False, border=0)
+
+
+def render_html(report):
+    """Single static page with one section per segment."""
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>",
+        f"<title>WUZZUF Market Pulse report {html.escape(report['data_version'])}</title>",
+        "<style>body{font-family:Inter,sans-serif;margin:2rem;color:#1e293b}"
+        "section{border-top:1px solid #cbd5e1;padding-top:1rem;margin-top:2rem}"
+        "table{border-collapse:collapse;margin-bottom:1rem}td,th{padding:2px 12px;text-align:left}"
+        "th{background:#e2e8f0}.tables{display:flex;flex-wrap:wrap;gap:2rem}</style></head><body>",
+        "<h1>WUZZUF Market Pulse</h1>",
+        f"<p>Data version {html.escape(report['data_version'])}, generated {html.escape(report['generated_at'])}. "
+        f"{len(report['segments'])} segments.</p><ul>",
+    ]
+    for i, segment in enumerate(report["segments"]):
+        parts.append(f"<li><a href='#s{i}'>{html.escape(segment['dimension'])}: {html.escape(segment['value'])}</a></li>")
+    parts.append("</ul>")
+
+    for i, segment in enumerate(report["segments"]):
+        kpis = segment["kpis"]
+        parts.append(f"<section id='s{i}'><h2>{html.escape(segment['dimension'])}: {html.escape(segment['value'])}</h2>")
+        parts.append(
+            f"<p><b>{kpis['unique_postings']}</b> unique postings ({kpis['listings']} listings) &middot; "
+            f"Top city: <b>{html.escape(str(kpis['top_city']))}</b> &middot; "
+            f"Top company: <b>{html.escape(str(kpis['top_company']))}</b> &middot; "
+            f"Top skill: <b>{html.escape(str(kpis['top_skill']))}</b></p><div class='tables'>")
+        for title, key in [("Top Companies", "top_companies"), ("Top Titles", "top_titles"),
+                           ("Top Cities", "top_cities"), ("Top Skills", "top_skills"),
+                           ("Years of Experience", "experience"), ("Level", "levels"),
+                           ("Job Type", "job_types"), ("Hiring Speed", "hiring_speed")]:
+            parts.append(_table(title, segment[key]))
+        parts.append("</div></section>")
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def build_reports(version=None, dimensions=SEGMENT_DIMENSIONS, workers=REPORT_WORKERS,
+                  min_postings=MIN_SEGMENT_POSTINGS, output_dir=REPORTS_DIR, config_path=frontier.CRAWL_CONFIG_PATH):
+    """
+    Writes report.json and report.html for every segment of the published data.
+    Returns the path of the report directory (None if there is no published data).
+    """
+    version = version or storage.current_version()
+    if version is None:
+        print("No published data. Run processor.py first.")
+        return None
+
+    start = time.perf_counter()
+    df = load_report_data(version)
+    query_names = [q["query"] for q in frontier.load_crawl_config(config_path)[0]] if "Query" in dimensions else []
+    segments = split_segments(df, dimensions, query_names, min_postings)
+    print(f"Summarizing {len(segments)} segments of {len(df)} rows with {workers} worker processes...")
+
+    # Each worker gets only the rows of its segment; the overall segment is the whole frame
+    tasks = ((dimension, value, df if positions is None else df.iloc[positions])
+             for dimension, value, positions in segments)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() keeps segment order: overall first, then dimension by dimension
+        entries = list(executor.map(_summarize, tasks))
+
+    report = {
+        "data_version": version,
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "segments": entries,
+    }
+    out_dir = os.path.join(output_dir, version)
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1, default=str)
+    with open(os.path.join(out_dir, "report.html"), "w", encoding="utf-8") as f:
+        f.write(render_html(report))
+    print(f"Wrote {len(entries)} segment reports to {out_dir} ({time.perf_counter() - start:.2f}s)")
+    return out_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the dashboard numbers for many segments (no Streamlit).")
+    parser.add_argument("--by", action="append", dest="dimensions",
+                        help=f"Segment dimension, repeatable (default: {', '.join(SEGMENT_DIMENSIONS)})")
+    parser.add_argument("--version", help="Published data version (default: current)")
+    parser.add_argument("--workers", type=int, default=REPORT_WORKERS)
+    parser.add_argument("--min-postings", type=int, default=MIN_SEGMENT_POSTINGS,
+                        help="Skip segments with fewer unique postings")
+    parser.add_argument("--out", default=REPORTS_DIR)
+    args = parser.parse_args()
+    build_reports(args.version, args.dimensions or SEGMENT_DIMENSIONS, args.workers, args.min_postings, args.out)
@@ -11,11 +11,11 @@ pip install -r requirements.txt
 echo.
 
 echo [2/3] Scraping fresh data from Wuzzuf...
-python scraper.py
+python scraper.py --details 300
 echo.
 
 echo [3/3] Launching Dashboard...
-echo (The app will automatically clean and filter the new data)
+echo (The app cleans and publishes the new data in the background)
 echo.
 
 streamlit run app.py
@@ -1,158 +1,954 @@
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
+import storage
+import metrics
+import frontier
+import archive
 import time
 import random
+import threading
+import os
+import json
+import hashlib
+import re
+import argparse
+import datetime
+import email.utils
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from requests.adapters import HTTPAdapter
 
-def scrape_wuzzuf():
-    base_url = "https://wuzzuf.net/search/jobs/"
-    queries = ["Data Analyst", "Machine Learning"]
+# Run metrics (written to data/metrics/scraper_run.json + scraper.prom at the end of a run)
+METRICS = metrics.Metrics("wuzzuf_scraper")
+
+# Politeness settings for wuzzuf.net (shared by all worker threads)
+MAX_WORKERS = 4
+REQUESTS_PER_SECOND = 0.5  # starting rate: ~1 request every 2s, same as the old 1-3s sleep
+BURST = 2
+REQUEST_TIMEOUT = 10
+
+# Adaptive throttling (AIMD): speed up while responses are fast, back off hard on 429 / 5xx / slow responses
+# All workers share one bucket, so these bound the whole crawl, whatever --workers is
+# (--rps / --min-rps / --max-rps override them). 2 requests/s is the most we consider polite
+# towards wuzzuf.net; going above it is possible but prints a warning.
+MIN_RPS = 0.2
+MAX_RPS = 2.0
+RPS_STEP = 0.05            # additive increase per fast response
+BACKOFF_FACTOR = 0.5       # multiplicative decrease on trouble
+SLOW_RESPONSE_SECONDS = 3.0
+LATENCY_RISE_FACTOR = 2.0  # a response this much slower than the recent average counts as trouble...
+FAST_RESPONSE_SECONDS = 1.0  # ...unless it still came back within 1s
+DECREASE_COOLDOWN = 2.0    # at most one decrease per 2s (a burst of errors = one cut, not five)
+
+# Retries of failed requests (timeouts, connection errors, 429, 5xx)
+MAX_RETRIES = 4
+RETRY_BASE_SECONDS = 2.0
+RETRY_MAX_SECONDS = 60.0
+RETRY_AFTER_MAX_SECONDS = 300  # give up on the page if the server wants us gone for longer
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# On-disk cache of search pages (ETag / Last-Modified + body)
+HTTP_CACHE_DIR = "data/http_cache"
+
+# Persistent index of jobs we already scraped (one fingerprint per line)
+SEEN_INDEX_PATH = "data/seen_jobs.txt"
+
+# Streaming output: new jobs are flushed every CHUNK_SIZE rows, progress is checkpointed
+CHUNK_SIZE = 200
+CHECKPOINT_PATH = "data/scrape_checkpoint.json"
+
+# Optional process pool for parsing (CPU-bound, so threads can't use more than one core)
+MAX_PENDING_PAGES = 16  # pages fetched but not parsed yet, across all queries (backpressure)
+
+# Headers to mimic a browser
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+# CSS Classes (extracted from inspection)
+# Note: These might change if Wuzzuf redeploys. 
+# Using more generic structure where possible or these specific hashes.
+CARD_CLASS = "css-ghe2tq" 
+TITLE_CLASS = "css-o171kl" # Inside h2
+COMPANY_CLASS = "css-ipsyv7"
+LOCATION_CLASS = "css-16x61xq"
+DETAILS_CLASS = "css-1rhj4yg"
+TYPE_CLASS = "css-5jhz9n"
+
+YEARS_EXP_RE = re.compile(r'([0-9\+\-\s]+Yrs of Exp)')
+
+# Fast path: lxml.html + compiled XPath straight over the card nodes (no BeautifulSoup tree).
+# Without lxml every page goes through the BeautifulSoup / html.parser path.
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    FAST_PARSER = "lxml"
+except ImportError:
+    lxml_html = None
+    FAST_PARSER = "html.parser"
+
+
+def _class_xpath(tag, css_class):
+    """XPath step matching `tag` elements that have `css_class` among their classes (like bs4's class_=)."""
+    return f'{tag}[contains(concat(" ", normalize-space(@class), " "), " {css_class} ")]'
+
+
+if lxml_html is not None:
+    # Pages are UTF-8; an explicit encoding skips libxml2's charset sniffing
+    HTML_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+    CARDS_XPATH = etree.XPath("//" + _class_xpath("div", CARD_CLASS))
+    # (...)[1] = first match in document order, same as bs4's find()
+    CARD_H2_XPATH = etree.XPath("(.//h2)[1]")
+    FIRST_LINK_XPATH = etree.XPath("(.//a)[1]")
+    COMPANY_XPATH = etree.XPath("(.//" + _class_xpath("a", COMPANY_CLASS) + ")[1]")
+    LOCATION_XPATH = etree.XPath("(.//" + _class_xpath("span", LOCATION_CLASS) + ")[1]")
+    DETAILS_XPATH = etree.XPath("(.//" + _class_xpath("div", DETAILS_CLASS) + ")[1]")
+    TYPE_XPATH = etree.XPath("(.//" + _class_xpath("div", TYPE_CLASS) + ")[1]")
+    SPANS_XPATH = etree.XPath(".//span")
+    LINKS_XPATH = etree.XPath(".//a")
+    TEXT_XPATH = etree.XPath(".//text()")
+
+
+class RateLimiter:
+    """
+    Simple thread-safe token bucket.
+    Every request takes one token; tokens refill at `rate` per second up to `burst`.
+    """
+    def __init__(self, rate=REQUESTS_PER_SECOND, burst=BURST):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            # Small jitter so workers don't wake up in lockstep
+            wait += random.uniform(0, 0.1)
+            time.sleep(wait)
+            waited += wait
+
+    def release(self, latency=None, throttled=False, retry_after=None):
+        """Reports the outcome of a request. The plain bucket has a fixed rate, so nothing changes."""
+        return False
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    Token bucket whose rate and concurrency window adapt to the server (AIMD, like TCP congestion control).
+
+    - Fast response            -> rate += RPS_STEP, window += 1 / window (additive increase)
+    - 429 / 5xx / timeout /
+      slow or slowing response -> rate and window halved (multiplicative decrease)
+    - Retry-After              -> no worker sends anything until it has passed
+
+    Every acquire() must be followed by one release() with the outcome.
+    """
+    def __init__(self, rate=REQUESTS_PER_SECOND, burst=BURST, min_rate=MIN_RPS, max_rate=MAX_RPS,
+                 max_concurrency=MAX_WORKERS):
+        super().__init__(rate, burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_concurrency = max_concurrency
+        self.limit = 1.0  # requests allowed in flight (grows to max_concurrency)
+        self.in_flight = 0
+        self.avg_latency = None
+        self.last_decrease = 0.0
+        self.paused_until = 0.0
+        self.slot_free = threading.Condition(self.lock)
+
+    def acquire(self):
+        """Blocks until a slot in the window and a token are available. Returns the seconds spent waiting."""
+        start = time.monotonic()
+        with self.slot_free:
+            while self.in_flight >= int(self.limit):
+                self.slot_free.wait()
+            self.in_flight += 1
+            pause = self.paused_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+        super().acquire()
+        return time.monotonic() - start
+
+    def release(self, latency=None, throttled=False, retry_after=None):
+        """
+        latency     -> response time (None if the request failed)
+        throttled   -> 429 / 5xx / connection error
+        retry_after -> seconds from the Retry-After header
+        Returns True if the rate was cut.
+        """
+        with self.slot_free:
+            self.in_flight -= 1
+            now = time.monotonic()
+            slow = latency is not None and (
+                latency > SLOW_RESPONSE_SECONDS
+                or (self.avg_latency is not None and latency > FAST_RESPONSE_SECONDS
+                    and latency > LATENCY_RISE_FACTOR * self.avg_latency))
+            if latency is not None:
+                self.avg_latency = latency if self.avg_latency is None else 0.8 * self.avg_latency + 0.2 * latency
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+
+            decreased = False
+            if throttled or latency is None or slow:
+                if now - self.last_decrease >= DECREASE_COOLDOWN:
+                    self.rate = max(self.min_rate, self.rate * BACKOFF_FACTOR)
+                    self.limit = max(1.0, self.limit * BACKOFF_FACTOR)
+                    self.last_decrease = now
+                    decreased = True
+            else:
+                self.rate = min(self.max_rate, self.rate + RPS_STEP)
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self.slot_free.notify_all()
+
+        if decreased:
+            METRICS.inc("throttle_decreases_total", help="Times the adaptive limiter cut the request rate")
+        METRICS.set("throttle_rate_rps", self.rate, help="Current request rate of the adaptive limiter")
+        METRICS.set("throttle_concurrency_limit", int(self.limit), help="Current request window of the adaptive limiter")
+        return decreased
+
+
+def make_session(pool_size=MAX_WORKERS):
+    """
+    One keep-alive session shared by all workers (and all queries),
+    so we reuse TCP/TLS connections instead of opening one per page.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _cache_paths(url, params, cache_dir):
+    key = url + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, digest + ".json"), os.path.join(cache_dir, digest + ".html")
+
+
+def load_cached(url, params, cache_dir=HTTP_CACHE_DIR):
+    """
+    Returns (meta, body) for a cached page, or (None, None) if we never saw it.
+    A missing, empty or damaged body (its sha1 doesn't match the meta) also counts as not cached.
+    """
+    meta_path, body_path = _cache_paths(url, params, cache_dir)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            body = f.read()
+    except (OSError, ValueError):
+        return None, None
+    if not body or meta.get("sha1", hashlib.sha1(body).hexdigest()) != hashlib.sha1(body).hexdigest():
+        return None, None
+    return meta, body
+
+
+def save_cached(url, params, response, cache_dir=HTTP_CACHE_DIR):
+    """Stores the body + validators of a 200 response. Skipped if the server sent no validators."""
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return
+
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path, body_path = _cache_paths(url, params, cache_dir)
+    # Write to temp files first so a crash never leaves a half-written entry
+    with open(body_path + ".tmp", "wb") as f:
+        f.write(response.content)
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"url": url, "params": params, "etag": etag, "last_modified": last_modified,
+                   "sha1": hashlib.sha1(response.content).hexdigest()}, f)
+    os.replace(body_path + ".tmp", body_path)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def _remove_cached(url, params, cache_dir=HTTP_CACHE_DIR):
+    for path in _cache_paths(url, params, cache_dir):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), None if missing / invalid."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with full jitter, never shorter than what the server asked for."""
+    delay = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+    return max(delay, retry_after or 0)
+
+
+def fetch_page(session, url, params, headers, limiter, cache_dir=HTTP_CACHE_DIR, max_retries=MAX_RETRIES,
+               conditional=True):
+    """
+    Fetches one search page (rate limited).
+    Sends If-None-Match / If-Modified-Since when we have a cached copy and
+    reuses the cached body on 304 Not Modified. If the cached body is gone by then,
+    the page is requested once more without validators.
+    Timeouts, connection errors, 429 and 5xx are retried up to max_retries times with
+    jittered exponential backoff (at least as long as the server's Retry-After).
+    Returns (status_code, content) or (None, error message) if the request failed.
+    """
+    meta, cached_body = load_cached(url, params, cache_dir) if cache_dir and conditional else (None, None)
+    request_headers = dict(headers)
+    if meta:
+        if meta.get("etag"):
+            request_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            request_headers["If-Modified-Since"] = meta["last_modified"]
+
+    for attempt in range(max_retries + 1):
+        METRICS.inc("rate_limit_wait_seconds_total", limiter.acquire(),
+                    help="Time spent sleeping in the rate limiter")
+        start = time.perf_counter()
+        retry_after = None
+        try:
+            response = session.get(url, params=params, headers=request_headers, timeout=REQUEST_TIMEOUT)
+        except Exception as e:
+            limiter.release(throttled=True)
+            METRICS.inc("requests_total", labels={"status": "error"}, help="Search page requests by status")
+            result, reason = (None, str(e)), "error"
+        else:
+            latency = time.perf_counter() - start
+            throttled = response.status_code in RETRY_STATUSES
+            if throttled:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            limiter.release(latency, throttled, retry_after)
+            METRICS.observe("request_seconds", latency, help="Search page request latency")
+            METRICS.inc("requests_total", labels={"status": str(response.status_code)},
+                        help="Search page requests by status")
+            METRICS.inc("response_bytes_total", len(response.content), help="Response body bytes downloaded")
+            result, reason = (response.status_code, response.content), str(response.status_code)
+
+        if result[0] is not None and result[0] not in RETRY_STATUSES:
+            break
+        if attempt == max_retries or (retry_after or 0) > RETRY_AFTER_MAX_SECONDS:
+            print(f"    Giving up on {params} after {attempt + 1} attempt(s) ({reason}).")
+            return result
+        delay = backoff_delay(attempt, retry_after)
+        print(f"    Retrying {params} in {delay:.1f}s ({reason})...")
+        METRICS.inc("retries_total", labels={"reason": reason}, help="Retried requests by cause")
+        METRICS.inc("backoff_seconds_total", delay, help="Time spent in retry backoff")
+        time.sleep(delay)
+
+    status, content = result
+    if status == 304 and conditional:
+        if cached_body:
+            METRICS.inc("cache_hits_total", help="Pages served from the HTTP cache after a 304")
+            return 200, cached_body
+        # 304 but nothing usable to serve (entry removed or damaged since): ask for the full page
+        print(f"    No cached body for {params} after a 304, fetching it again without validators...")
+        METRICS.inc("cache_misses_total", help="304 responses without a usable cached body (refetched)")
+        _remove_cached(url, params, cache_dir)
+        return fetch_page(session, url, params, headers, limiter, cache_dir, max_retries, conditional=False)
+    if status == 200 and cache_dir:
+        save_cached(url, params, response, cache_dir)
+    return status, content
+
+
+def find_job_cards(soup):
+    """
+    Returns (job card tags, used_fallback) of a parsed page.
+    used_fallback is True when the card class matched nothing and we fell back to h2 parents.
+    """
+    job_cards = soup.find_all('div', class_=CARD_CLASS)
+    if job_cards:
+        return job_cards, False
+    # Fallback: Try finding h2 and parent divs if main class changed
+    h2s = soup.find_all('h2')
+    return [h2.find_parent('div').find_parent('div') for h2 in h2s], bool(h2s)
+
+
+def parse_card(card):
+    """Extracts one job record (same fields as the CSV) from a job card tag."""
+    # Title + link to the posting
+    h2 = card.find('h2')
+    title = h2.text.strip() if h2 else "N/A"
+    title_link = h2.find('a') if h2 else None
+    job_url = title_link.get('href', "N/A") if title_link else "N/A"
+    
+    # Company
+    company_tag = card.find('a', class_=COMPANY_CLASS)
+    company = company_tag.text.strip().replace(' -', '') if company_tag else "N/A"
+    
+    # Location
+    location_tag = card.find('span', class_=LOCATION_CLASS)
+    location = location_tag.text.strip() if location_tag else "N/A"
     
-    # CSS Classes (extracted from inspection)
-    # Note: These might change if Wuzzuf redeploys. 
-    # Using more generic structure where possible or these specific hashes.
-    CARD_CLASS = "css-ghe2tq" 
-    TITLE_CLASS = "css-o171kl" # Inside h2
-    COMPANY_CLASS = "css-ipsyv7"
-    LOCATION_CLASS = "css-16x61xq"
+    # Metadata container (Skills, Type, Level)
+    # Usually in div.css-1rhj4yg
+    # It contains: Type (Full time), Level (Entry Level), Experience (x Yrs), Skills...
+    details_container = card.find('div', class_=DETAILS_CLASS)
     
-    # Headers to mimic a browser
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
+    job_type = "Full Time" # Default/Placeholder
+    level = "N/A"
+    years_exp = "N/A"
+    skills = []
+    
+    if details_container:
+        # The first div.css-5jhz9n usually has Type and Remote/Onsite
+        type_div = details_container.find('div', class_=TYPE_CLASS)
+        if type_div:
+            types = [t.text.strip() for t in type_div.find_all('span')]
+            if types: job_type = ", ".join(types)
+        
+        # All 'a' tags in details_container that are NOT in type_div
+        for link in details_container.find_all('a'):
+            if link.parent == type_div:
+                continue
+            text = link.text.strip()
+            
+            # Categorize based on common keywords
+            if "Level" in text:
+                level = text
+            elif "Yrs" in text:
+                years_exp = text # might be in span?
+            else:
+                skills.append(text)
+                
+        # Check text nodes for "Yrs of Exp" if not in 'a'
+        # In debug: <span> · 2 - 3 Yrs of Exp</span>
+        text_content = details_container.get_text(" | ")
+        if "Yrs of Exp" in text_content:
+            match = YEARS_EXP_RE.search(text_content)
+            if match:
+                years_exp = match.group(1)
+
+    return {
+        "Job Title": title,
+        "Company Name": company,
+        "Location": location,
+        "Job Type": job_type,
+        "Level": level,
+        "Years of Experience": years_exp,
+        "Skills": ", ".join(skills),
+        "Country": "Egypt",
+        "Job URL": job_url
     }
 
-    all_jobs = []
 
-    for query in queries:
-        print(f"Scraping query: {query}")
-        for page in range(5): # Limit to 5 pages per query (approx 75 jobs) -> Total 150 jobs
-            params = {
-                'q': query,
-                'a': 'hpb',
-                'start': page
-            }
-            
+def parse_card_lxml(card):
+    """lxml version of parse_card(): same fields, same values, without building a soup."""
+    h2s = CARD_H2_XPATH(card)
+    h2 = h2s[0] if h2s else None
+    title = h2.text_content().strip() if h2 is not None else "N/A"
+    links = FIRST_LINK_XPATH(h2) if h2 is not None else []
+    job_url = links[0].get('href', "N/A") if links else "N/A"
+
+    company_tags = COMPANY_XPATH(card)
+    company = company_tags[0].text_content().strip().replace(' -', '') if company_tags else "N/A"
+
+    location_tags = LOCATION_XPATH(card)
+    location = location_tags[0].text_content().strip() if location_tags else "N/A"
+
+    job_type = "Full Time"
+    level = "N/A"
+    years_exp = "N/A"
+    skills = []
+
+    details = DETAILS_XPATH(card)
+    if details:
+        details = details[0]
+        type_divs = TYPE_XPATH(details)
+        type_div = type_divs[0] if type_divs else None
+        if type_div is not None:
+            types = [t.text_content().strip() for t in SPANS_XPATH(type_div)]
+            if types: job_type = ", ".join(types)
+
+        for link in LINKS_XPATH(details):
+            if type_div is not None and link.getparent() is type_div:
+                continue
+            text = link.text_content().strip()
+            if "Level" in text:
+                level = text
+            elif "Yrs" in text:
+                years_exp = text
+            else:
+                skills.append(text)
+
+        # Same text bs4's get_text(" | ") gives: every text node, joined
+        text_content = " | ".join(TEXT_XPATH(details))
+        if "Yrs of Exp" in text_content:
+            match = YEARS_EXP_RE.search(text_content)
+            if match:
+                years_exp = match.group(1)
+
+    return {
+        "Job Title": title,
+        "Company Name": company,
+        "Location": location,
+        "Job Type": job_type,
+        "Level": level,
+        "Years of Experience": years_exp,
+        "Skills": ", ".join(skills),
+        "Country": "Egypt",
+        "Job URL": job_url
+    }
+
+
+def _lxml_cards(content):
+    """Job card elements of a page parsed with lxml ([] if the card class matches nothing)."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    if not content.strip():
+        return []
+    return CARDS_XPATH(lxml_html.document_fromstring(content, parser=HTML_PARSER))
+
+
+def parse_page(content, fast=True):
+    """
+    Parses a search results page into (job records, stats).
+    Plain function with picklable inputs/outputs, so it can run in a worker process;
+    the caller records the stats (parse time, cards, fallback hits, card errors).
+
+    fast=True  -> lxml.html + compiled XPath over the card nodes (parse_card_lxml).
+                  Falls back to the BeautifulSoup path when no cards match (selectors changed).
+    fast=False -> the original full-document html.parser path (kept for benchmarking).
+    """
+    start = time.perf_counter()
+    job_cards = []
+    used_fallback = False
+    card_parser = parse_card
+    if fast and lxml_html is not None:
+        job_cards = _lxml_cards(content)
+        card_parser = parse_card_lxml
+    if not job_cards:
+        soup = BeautifulSoup(content, FAST_PARSER if fast else 'html.parser')
+        job_cards, used_fallback = find_job_cards(soup)
+        card_parser = parse_card
+
+    jobs = []
+    card_errors = 0
+    for card in job_cards:
+        try:
+            jobs.append(card_parser(card))
+        except Exception as e:
+            card_errors += 1
+            print(f"Error parsing card: {e}")
+
+    stats = {
+        "parse_seconds": time.perf_counter() - start,
+        "cards": len(job_cards),
+        "fallback": used_fallback,
+        "card_errors": card_errors,
+    }
+    return jobs, stats
+
+
+def record_parse_stats(stats):
+    METRICS.observe("parse_seconds", stats["parse_seconds"], help="Parse time per page")
+    METRICS.observe("cards_per_page", stats["cards"], buckets=metrics.COUNT_BUCKETS,
+                    help="Job cards found per page (drops when selectors break)")
+    METRICS.inc("pages_parsed_total", help="Pages parsed")
+    if stats["fallback"]:
+        METRICS.inc("fallback_pages_total", help="Pages parsed through the h2 parent fallback")
+    if stats["card_errors"]:
+        METRICS.inc("card_errors_total", stats["card_errors"], help="Cards that failed to parse")
+
+
+def extract_jobs(content, fast=True):
+    """Parses a search results page into a list of job records (see parse_page)."""
+    jobs, stats = parse_page(content, fast)
+    record_parse_stats(stats)
+    return jobs
+
+
+def job_fingerprint(job):
+    """Stable id of a posting: hash of title, company, location and posting URL."""
+    key = "\x1f".join(str(job.get(k, "")) for k in ("Job Title", "Company Name", "Location", "Job URL"))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def load_seen_index(path=SEEN_INDEX_PATH):
+    """Returns the set of fingerprints of every job scraped in previous runs."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def append_seen_index(fingerprints, path=SEEN_INDEX_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for fp in fingerprints:
+            f.write(fp + "\n")
+
+
+def load_checkpoint(path=CHECKPOINT_PATH):
+    """Progress of an interrupted run ({"run_id": ..., "queries": {query: {"next_page", "done"}}}), or None."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_checkpoint(checkpoint, path=CHECKPOINT_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+# === CRAWL: frontier -> fetch -> parse -> dedupe -> sink ===
+# Worker threads take (query, page) items from the crawl frontier (frontier.py),
+# highest priority first. Postings are deduped across queries before they are saved.
+
+class ParsePool:
+    """
+    ProcessPoolExecutor running parse_page() on fetched page bodies.
+    At most `max_pending` pages can be waiting for / in parsing; fetchers block on submit()
+    when the parsers fall behind, so a slow parser can't pile up pages in memory.
+    """
+    def __init__(self, workers, max_pending=MAX_PENDING_PAGES):
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, content):
+        self.slots.acquire()
+        future = self.executor.submit(parse_page, content)
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+def parse_content(content, pool=None):
+    """Job records of a fetched page, parsed inline or in the process pool (waits for the result)."""
+    if pool is None:
+        return extract_jobs(content)
+    jobs, stats = pool.submit(content).result()
+    record_parse_stats(stats)  # the worker process can't update our metrics
+    return jobs
+
+
+def dedupe_jobs(jobs, known, seen, lock):
+    """
+    Returns (new_jobs, new_fingerprints, unseen_before).
+    known -> jobs from previous runs: a page made up only of those ends the query.
+    seen  -> shared set of everything seen so far (incl. this run, across queries).
+    """
+    fingerprints = [job_fingerprint(job) for job in jobs]
+    unseen_before = sum(1 for fp in fingerprints if fp not in known)
+
+    new_jobs, new_fps = [], []
+    with lock:
+        for job, fp in zip(jobs, fingerprints):
+            if fp not in seen:
+                seen.add(fp)
+                new_jobs.append(job)
+                new_fps.append(fp)
+    METRICS.inc("jobs_seen_total", len(jobs), help="Jobs parsed (before dedupe)")
+    METRICS.inc("jobs_new_total", len(new_jobs), help="Jobs not seen before")
+    # New to the index, but already found under another query in this run
+    METRICS.inc("jobs_cross_query_duplicates_total", unseen_before - len(new_jobs),
+                help="Postings found under more than one query in this run")
+    return new_jobs, new_fps, unseen_before
+
+
+def fetch_search_page(session, url, query, page, headers, limiter, cache_dir=HTTP_CACHE_DIR, page_archive=None):
+    """Fetches one search page (archived right away, if page_archive is given). Returns the body or None."""
+    params = {'q': query, 'a': 'hpb', 'start': page}
+    print(f"  [{query}] Fetching page {page}...")
+    status, content = fetch_page(session, url, params, headers, limiter, cache_dir)
+    if status is None:
+        print(f"  [{query}] Error fetching page: {content}")
+        return None
+    if status != 200:
+        print(f"  [{query}] Failed to retrieve page {page}: {status}")
+        return None
+    if page_archive is not None:
+        # Raw HTML is kept before parsing, so a selector change can be fixed offline (replay.py)
+        page_archive.add(query, page, url, content)
+    return content
+
+
+def page_outcome(query, page, jobs, known, seen, lock):
+    """Dedupes the jobs of a parsed page. Returns (jobs on the page, new jobs, their fingerprints, stop reason)."""
+    if not jobs:
+        print(f"  [{query}] No jobs found on this page.")
+        return 0, [], [], "exhausted"
+
+    new_jobs, new_fps, unseen_before = dedupe_jobs(jobs, known, seen, lock)
+    print(f"    [{query}] Found {len(jobs)} jobs ({len(new_jobs)} new).")
+    if unseen_before == 0:
+        print(f"  [{query}] Page {page} already seen, stopping this query.")
+        return len(jobs), new_jobs, new_fps, "seen"
+    return len(jobs), new_jobs, new_fps, None
+
+
+def crawl_page(session, url, query, page, headers, limiter, known, seen, lock,
+               parse_pool=None, cache_dir=HTTP_CACHE_DIR, page_archive=None):
+    """
+    Fetches, parses and dedupes one search page, waiting for the parse.
+    Returns (jobs on the page, new jobs, their fingerprints, stop reason or None).
+    """
+    content = fetch_search_page(session, url, query, page, headers, limiter, cache_dir, page_archive)
+    if content is None:
+        return 0, [], [], "error"
+    try:
+        jobs = parse_content(content, parse_pool)
+    except Exception as e:
+        print(f"  [{query}] Error parsing page: {e}")
+        return 0, [], [], "error"
+    return page_outcome(query, page, jobs, known, seen, lock)
+
+
+class ChunkedSink:
+    """
+    Buffers new jobs of one query and flushes them to the history store every `chunk_size` rows.
+    After each flush the seen-jobs index and the checkpoint (next page to fetch) are updated,
+    so an interrupted run loses at most one unflushed chunk and resumes from there.
+    """
+    def __init__(self, query, query_index, run_id, checkpoint, lock, chunk_size=CHUNK_SIZE):
+        self.query = query
+        self.query_index = query_index
+        self.run_id = run_id
+        self.checkpoint = checkpoint
+        self.lock = lock
+        self.chunk_size = chunk_size
+        self.jobs = []
+        self.fingerprints = []
+        self.chunks = 0
+        self.saved = 0
+
+    def add(self, page, jobs, fingerprints):
+        self.jobs.extend(jobs)
+        self.fingerprints.extend(fingerprints)
+        if len(self.jobs) >= self.chunk_size:
+            self.flush(next_page=page + 1)
+
+    def flush(self, next_page, done=False):
+        with self.lock:
+            if self.jobs:
+                # Names sort by (run, query, chunk) -> deterministic row order when reading back
+                name = f"part-{self.run_id}-{self.query_index:03d}-{self.chunks:05d}.parquet"
+                with METRICS.timer("flush_seconds", help="Time to write one chunk + index update"):
+                    storage.write_snapshot(pd.DataFrame(self.jobs), part_name=name)
+                    append_seen_index(self.fingerprints)
+                METRICS.inc("rows_written_total", len(self.jobs), help="New job rows written")
+                self.saved += len(self.jobs)
+                self.chunks += 1
+                self.jobs, self.fingerprints = [], []
+            self.checkpoint["queries"][self.query] = {"next_page": next_page, "done": done}
+            save_checkpoint(self.checkpoint)
+
+
+def finish_item(crawl, sinks, state, page, jobs_seen, new_jobs, new_fps, stop_reason):
+    """Records a crawled page: frontier update, new jobs to the sink, then the query goes back in the queue."""
+    try:
+        done = crawl.update(state, page, jobs_seen, len(new_jobs), stop_reason)
+        sink = sinks[state.query]
+        sink.add(page, new_jobs, new_fps)
+        if done:
+            print(f"  [{state.query}] Done ({state.stop_reason}).")
+            METRICS.inc("query_stops_total", labels={"reason": state.stop_reason},
+                        help="Queries finished, by reason")
+            # A page that failed even after retries is fetched again by a same-day rerun
+            sink.flush(next_page=state.next_page, done=state.stop_reason != "error")
+    finally:
+        crawl.release(state)
+
+
+def _on_parsed(future, crawl, sinks, state, page, known, seen, lock):
+    """Done-callback of a page parsed in the pool: dedupes it and finishes its work item."""
+    outcome = (0, [], [], "error")
+    try:
+        jobs, stats = future.result()
+        record_parse_stats(stats)  # the worker process can't update our metrics
+        outcome = page_outcome(state.query, page, jobs, known, seen, lock)
+    except Exception as e:
+        print(f"  [{state.query}] Error parsing page: {e}")
+    finally:
+        finish_item(crawl, sinks, state, page, *outcome)
+
+
+def crawl_worker(crawl, sinks, session, url, headers, limiter, known, seen, lock,
+                 parse_pool=None, cache_dir=HTTP_CACHE_DIR, page_archive=None):
+    """
+    Takes work items from the frontier until the crawl is over.
+    With a parse pool the page is handed off after the fetch and this thread goes on to the
+    next item (another query's page) while it's parsed; the query only re-enters the frontier
+    from the parse callback, so its pages are still consumed in order. ParsePool's
+    max_pending bounds how many fetched pages can wait for a parser.
+    """
+    while True:
+        item = crawl.next_item()
+        if item is None:
+            return
+        state, page = item
+        if parse_pool is None:
+            outcome = (0, [], [], "error")
             try:
-                print(f"  Fetching page {page}...")
-                response = requests.get(base_url, params=params, headers=headers, timeout=10)
-                if response.status_code != 200:
-                    print(f"  Failed to retrieve page {page}: {response.status_code}")
-                    break
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                job_cards = soup.find_all('div', class_=CARD_CLASS)
-                
-                if not job_cards:
-                    # Fallback: Try finding h2 and parent divs if main class changed
-                    h2s = soup.find_all('h2')
-                    if h2s:
-                        job_cards = [h2.find_parent('div').find_parent('div') for h2 in h2s]
-                    else:
-                        print("  No jobs found on this page.")
-                        break
-
-                print(f"    Found {len(job_cards)} jobs.")
-                
-                for card in job_cards:
-                    try:
-                        # Title
-                        h2 = card.find('h2')
-                        title = h2.text.strip() if h2 else "N/A"
-                        
-                        # Company
-                        company_tag = card.find('a', class_=COMPANY_CLASS)
-                        company = company_tag.text.strip().replace(' -', '') if company_tag else "N/A"
-                        
-                        # Location
-                        location_tag = card.find('span', class_=LOCATION_CLASS)
-                        location = location_tag.text.strip() if location_tag else "N/A"
-                        
-                        # Metadata container (Skills, Type, Level)
-                        # The generic structure is: Attributes are in 'a' tags or text in the lower divs
-                        # Let's extract all text from the bottom container as "Skills/Details"
-                        # We can try to parse specific fields if they are consistent
-                        
-                        # Extracting filters/tags
-                        # Usually in div.css-1rhj4yg
-                        # It contains: Type (Full time), Level (Entry Level), Experience (x Yrs), Skills...
-                        
-                        details_container = card.find('div', class_='css-1rhj4yg') # Use the class seen in debug
-                        
-                        job_type = "Full Time" # Default/Placeholder
-                        level = "N/A"
-                        years_exp = "N/A"
-                        skills = []
-                        
-                        if details_container:
-                            # Extract all text segments or 'a' tags
-                            # The first div.css-5jhz9n usually has Type and Remote/Onsite
-                            type_div = details_container.find('div', class_='css-5jhz9n')
-                            if type_div:
-                                types = [t.text.strip() for t in type_div.find_all('span')]
-                                if types: job_type = ", ".join(types)
-                            
-                            # The rest are in the parent div or a sibling div?
-                            # In debug: <div> <a ...>Entry Level</a> <span>...</span> </div>
-                            # We can just get all 'a' tags in details_container that are NOT in type_div
-                            
-                            all_links = details_container.find_all('a')
-                            for link in all_links:
-                                text = link.text.strip()
-                                link_parent = link.parent
-                                if link_parent == type_div:
-                                    continue
-                                
-                                # Categorize based on common keywords
-                                if "Level" in text:
-                                    level = text
-                                elif "Yrs" in text:
-                                    years_exp = text # might be in span?
-                                else:
-                                    skills.append(text)
-                                    
-                            # Check text nodes for "Yrs of Exp" if not in 'a'
-                            # In debug: <span> · 2 - 3 Yrs of Exp</span>
-                            text_content = details_container.get_text(" | ")
-                            if "Yrs of Exp" in text_content:
-                                import re
-                                match = re.search(r'([0-9\+\-\s]+Yrs of Exp)', text_content)
-                                if match:
-                                    years_exp = match.group(1)
-
-                        all_jobs.append({
-                            "Job Title": title,
-                            "Company Name": company,
-                            "Location": location,
-                            "Job Type": job_type,
-                            "Level": level,
-                            "Years of Experience": years_exp,
-                            "Skills": ", ".join(skills),
-                            "Country": "Egypt"
-                        })
-                        
-                    except Exception as e:
-                        print(f"Error parsing card: {e}")
-                        continue
-                
-                time.sleep(random.uniform(1, 3)) # Polite delay
-                
-            except Exception as e:
-                print(f"Error fetching page: {e}")
-                break
-
-    # Save to CSV
-    df = pd.DataFrame(all_jobs)
-    # Remove duplicates
-    df.drop_duplicates(inplace=True)
-    
-    # Save
-    import os
-    os.makedirs("data", exist_ok=True)
-    output_path = "data/wuzzuf_jobs_raw.csv"
-    df.to_csv(output_path, index=False)
-    print(f"Scraping complete. Saved {len(df)} jobs to {output_path}")
+                outcome = crawl_page(session, url, state.query, page, headers, limiter, known, seen, lock,
+                                     None, cache_dir, page_archive)
+            finally:
+                finish_item(crawl, sinks, state, page, *outcome)
+            continue
+
+        future = None
+        try:
+            content = fetch_search_page(session, url, state.query, page, headers, limiter, cache_dir, page_archive)
+            if content is not None:
+                future = parse_pool.submit(content)  # blocks while max_pending pages wait for a parser
+        finally:
+            if future is None:
+                finish_item(crawl, sinks, state, page, 0, [], [], "error")
+        if future is None:
+            continue
+        future.add_done_callback(
+            lambda f, state=state, page=page: _on_parsed(f, crawl, sinks, state, page, known, seen, lock))
+
+
+def scrape_wuzzuf(max_workers=MAX_WORKERS, incremental=True, parse_workers=0,
+                  config_path=frontier.CRAWL_CONFIG_PATH, max_requests=None, max_seconds=None,
+                  max_rps=MAX_RPS, details=0, keep_html=True, rps=REQUESTS_PER_SECOND, min_rps=MIN_RPS):
+    """
+    max_workers   -> pages fetched in parallel (threads)
+    incremental   -> skip jobs already in the seen index (False = full re-scrape)
+    parse_workers -> >0 parses pages in a process pool of that size, 0 parses inline
+    config_path   -> crawl config (queries, page budgets, priorities, run budget)
+    max_requests / max_seconds -> override the run budget of the config
+    rps / min_rps / max_rps -> starting rate, floor and ceiling of the adaptive request rate (requests/s,
+                     shared by all workers)
+    details       -> >0 fetches the detail pages of up to that many jobs without details (enrich.py)
+    keep_html     -> store every fetched search page in the raw HTML archive (archive.py)
+    """
+    base_url = "https://wuzzuf.net/search/jobs/"
+    query_settings, budget = frontier.load_crawl_config(config_path)
+    if max_requests is not None:
+        budget["max_requests"] = max_requests
+    if max_seconds is not None:
+        budget["max_seconds"] = max_seconds
+
+    METRICS.reset()
+
+    # Move the old raw CSV into the history store the first time we run
+    storage.import_legacy_csv()
+
+    known = load_seen_index() if incremental else set()
+    print(f"Loaded {len(known)} already-seen jobs.")
+
+    # Resume an interrupted run from today if there is a checkpoint
+    # (a stale one from an earlier day is ignored, those pages have changed since)
+    run_id = time.strftime("%Y%m%dT%H%M%S")
+    checkpoint = load_checkpoint()
+    if checkpoint and checkpoint.get("run_id", "")[:8] == run_id[:8]:
+        print(f"Resuming interrupted run {checkpoint['run_id']}...")
+    else:
+        checkpoint = {"run_id": run_id, "queries": {}}
+        save_checkpoint(checkpoint)
+
+    lock = threading.Lock()
+    states = []
+    sinks = {}
+    for i, settings in enumerate(query_settings):
+        progress = checkpoint["queries"].get(settings["query"], {})
+        states.append(frontier.QueryState(i, settings, progress.get("next_page", 0), progress.get("done", False)))
+        sinks[settings["query"]] = ChunkedSink(settings["query"], i, run_id, checkpoint, lock)
+    crawl = frontier.CrawlFrontier(states, budget["max_requests"], budget["max_seconds"])
+
+    # Workers share one frontier: pages of a query stay in order, queries are interleaved by priority
+    if max_rps > MAX_RPS:
+        print(f"Warning: --max-rps {max_rps} is above the {MAX_RPS} requests/s we consider polite for wuzzuf.net.")
+    # Keep the starting rate between the floor and the ceiling
+    rps = min(max(rps, min_rps), max_rps)
+    limiter = AdaptiveRateLimiter(rate=rps, min_rate=min_rps, max_rate=max_rps, max_concurrency=max_workers)
+    session = make_session(max_workers)
+    seen = set(known)
+    parse_pool = ParsePool(parse_workers) if parse_workers > 0 else None
+    page_archive = archive.PageArchive(run_id) if keep_html else None
+    print(f"Crawling {len(states)} queries with {max_workers} workers"
+          f" ({parse_workers or 'inline'} parser processes, budget: {budget})...")
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(crawl_worker, crawl, sinks, session, base_url, HEADERS, limiter,
+                                known, seen, lock, parse_pool, HTTP_CACHE_DIR, page_archive)
+                for _ in range(max_workers)
+            ]
+            for future in futures:
+                future.result()
+        # Pages handed to the parse pool may still be finishing (e.g. the budget ran out meanwhile)
+        crawl.wait_idle()
+        # Queries cut off by the budget: save what they found, keep their next page for a resume
+        for state in states:
+            if not state.done:
+                sinks[state.query].flush(next_page=state.next_page)
+
+        # Optional enrichment stage: detail pages of new jobs (each one is fetched once, ever)
+        if details > 0:
+            import enrich  # enrich imports this module
+            enrich.enrich_details(enrich.pending_job_urls(details), session, limiter)
+    finally:
+        if parse_pool:
+            parse_pool.shutdown()
+        METRICS.set("frontier_requests", crawl.requests, help="Page requests handed out by the frontier")
+        if page_archive is not None:
+            METRICS.set("archived_pages", page_archive.pages, help="Search pages added to the HTML archive")
+        # Reported even if the run failed (that's when it's most useful)
+        json_path, prom_path = METRICS.write("scraper")
+        print(f"Run metrics written to {json_path} and {prom_path}")
+
+    for row in crawl.summary():
+        print(f"  {row['query']:40s} pages={row['pages']:3d} new={row['jobs_new']:5d}/{row['jobs_seen']:5d}"
+              f"  ({row['stop_reason']})")
+    total = sum(sink.saved for sink in sinks.values())
+
+    # Every query finished -> next run starts from scratch
+    # (if the budget cut the crawl short or pages failed, the checkpoint lets a rerun today pick up the rest)
+    if all(state.done and state.stop_reason != "error" for state in states):
+        os.remove(CHECKPOINT_PATH)
+    print(f"Scraping complete. Saved {total} new jobs to {storage.HISTORY_DIR}")
 
 if __name__ == "__main__":
-    scrape_wuzzuf()
+    parser = argparse.ArgumentParser(description="Scrape Wuzzuf job listings.")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Pages fetched in parallel")
+    parser.add_argument("--rps", type=float, default=REQUESTS_PER_SECOND,
+                        help="Starting request rate (requests/s, shared by all workers)")
+    parser.add_argument("--min-rps", type=float, default=MIN_RPS, help="Floor of the adaptive request rate")
+    parser.add_argument("--max-rps", type=float, default=MAX_RPS,
+                        help=f"Ceiling of the adaptive request rate (above {MAX_RPS} is not polite)")
+    parser.add_argument("--parse-workers", type=int, default=0,
+                        help="Parser processes (0 = parse in the fetching threads)")
+    parser.add_argument("--full", action="store_true", help="Ignore the seen-jobs index")
+    parser.add_argument("--config", default=frontier.CRAWL_CONFIG_PATH, help="Crawl config (JSON)")
+    parser.add_argument("--max-requests", type=int, help="Page request budget for this run")
+    parser.add_argument("--max-seconds", type=float, help="Time budget for this run")
+    parser.add_argument("--details", type=int, default=0, metavar="N",
+                        help="Also fetch detail pages (posting date, vacancies) of up to N jobs")
+    parser.add_argument("--no-archive", action="store_true", help="Don't keep the raw HTML of fetched pages")
+    args = parser.parse_args()
+    if not 0 < args.min_rps <= args.max_rps:
+        parser.error("--min-rps must be > 0 and not above --max-rps")
+    scrape_wuzzuf(max_workers=args.workers, incremental=not args.full, parse_workers=args.parse_workers,
+                  config_path=args.config, max_requests=args.max_requests, max_seconds=args.max_seconds,
+                  max_rps=args.max_rps, details=args.details, keep_html=not args.no_archive,
+                  rps=args.rps, min_rps=args.min_rps)
@@ -0,0 +1,209 @@
+import bisect
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import storage
+
+# Columns covered by the Details page search
+SEARCH_COLUMNS = ["Job Title", "Company Name", "Skills", "Location"]
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Rows handled per batch while building the postings (bounds the per-trigram temporaries,
+# ~150 trigrams per row -> a few 10 MB per batch)
+INDEX_CHUNK_ROWS = 20_000
+
+
+# === BUILD (processor) ===
+# The postings are built once per data version by the processor and published as
+# uncompressed Arrow files (see storage.SEARCH_*_FILE), CSR style:
+#   search_texts.arrow    -> Text                     one lowercase text per row (row position = Job ID)
+#   search_trigrams.arrow -> Trigram (int64), Rows    sorted by Trigram; Rows = sorted row positions
+#   search_tokens.arrow   -> Token (string), Rows     sorted by Token
+# A trigram is packed into one int64 (3 code points x 21 bits), so lookups are a searchsorted.
+
+def search_texts(df, columns=SEARCH_COLUMNS):
+    """One lowercase string per row: the searched columns joined with " | "."""
+    columns = [c for c in columns if c in df.columns]
+    if not columns:
+        return pd.Series([""] * len(df), dtype=object)
+    text = df[columns[0]].astype(str)
+    for column in columns[1:]:
+        text = text + " | " + df[column].astype(str)
+    return text.str.lower().reset_index(drop=True)
+
+
+def trigram_key(gram):
+    return (ord(gram[0]) << 42) | (ord(gram[1]) << 21) | ord(gram[2])
+
+
+def _trigram_pairs(texts):
+    """(trigram key, row) for every trigram position of the texts, in one numpy pass."""
+    lengths = texts.str.len().to_numpy(dtype=np.int64)
+    points = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    rows = np.repeat(np.arange(len(texts)), lengths)
+    ends = np.repeat(np.cumsum(lengths), lengths)
+    # Positions where a whole trigram fits before the end of its row
+    starts = np.flatnonzero(np.arange(len(points)) + 3 <= ends)
+    keys = (points[starts] << 42) | (points[starts + 1] << 21) | points[starts + 2]
+    return keys, rows[starts]
+
+
+def _token_pairs(texts):
+    """(token, row) for every word of the texts."""
+    words = texts.str.findall(TOKEN_RE)
+    keys = np.array([word for row in words for word in row], dtype=object)
+    return keys, np.repeat(np.arange(len(texts)), words.str.len().to_numpy(dtype=np.int64))
+
+
+def _unique_pairs(keys, rows, n_rows):
+    """(key, row) pairs without repeats, sorted by key then row."""
+    codes, uniques = pd.factorize(keys, sort=True)
+    pairs = np.sort(codes.astype(np.int64) * n_rows + rows)
+    pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if len(pairs) else pairs
+    return np.asarray(uniques)[pairs // n_rows], pairs % n_rows
+
+
+def _chunks(texts):
+    for first in range(0, len(texts), INDEX_CHUNK_ROWS):
+        yield first, texts.iloc[first:first + INDEX_CHUNK_ROWS]
+
+
+def _postings(texts, pair_maker, key_type):
+    """
+    Arrow table (key, Rows) of the sorted keys and the sorted row positions having them.
+    Two passes over the texts in chunks: the first collects the keys and how many rows
+    have each, the second writes every row straight into its slot of one flat array.
+    """
+    chunk_keys, chunk_counts = [], []
+    for _, chunk in _chunks(texts):
+        keys, _ = _unique_pairs(*pair_maker(chunk), len(chunk))
+        keys, counts = np.unique(keys, return_counts=True)
+        chunk_keys.append(keys)
+        chunk_counts.append(counts)
+    if chunk_keys:
+        vocab, inverse = np.unique(np.concatenate(chunk_keys), return_inverse=True)
+        counts = np.bincount(inverse.ravel(), weights=np.concatenate(chunk_counts), minlength=len(vocab))
+    else:
+        vocab, counts = np.array([], dtype=key_type.to_pandas_dtype()), np.zeros(0)
+    offsets = np.r_[0, np.cumsum(counts)].astype(np.int64)
+
+    rows_out = np.empty(offsets[-1], dtype=np.int32)
+    cursor = offsets[:-1].copy()
+    for first, chunk in _chunks(texts):
+        keys, rows = _unique_pairs(*pair_maker(chunk), len(chunk))
+        ids = np.searchsorted(vocab, keys)
+        # Rank of each pair within its key -> slot after the rows of the earlier chunks
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]]) if len(ids) else np.zeros(0, dtype=np.int64)
+        sizes = np.diff(np.r_[starts, len(ids)])
+        rank = np.arange(len(ids)) - np.repeat(starts, sizes)
+        rows_out[cursor[ids] + rank] = rows + first
+        cursor[ids[starts]] += sizes
+
+    rows = pa.LargeListArray.from_arrays(pa.array(offsets, type=pa.int64()), pa.array(rows_out, type=pa.int32()))
+    return pa.table({"Key": pa.array(vocab.tolist(), type=key_type), "Rows": rows})
+
+
+def build_search_tables(df, columns=SEARCH_COLUMNS):
+    """(texts, trigrams, tokens) Arrow tables of the search index over `df` (see above)."""
+    texts = search_texts(df, columns)
+    return (
+        pa.table({"Text": pa.array(texts.tolist(), type=pa.large_string())}),
+        _postings(texts, _trigram_pairs, pa.int64()).rename_columns(["Trigram", "Rows"]),
+        _postings(texts, _token_pairs, pa.string()).rename_columns(["Token", "Rows"]),
+    )
+
+
+# === QUERY (app) ===
+
+def _array(column):
+    """Single Arrow array of a column (zero-copy when the file holds one chunk, as published)."""
+    if column.num_chunks == 1:
+        return column.chunk(0)
+    return pa.concat_arrays(column.chunks) if column.num_chunks else pa.array([], type=column.type)
+
+
+class SearchIndex:
+    """
+    Search index over the text columns of the clean data, read from the processor's postings.
+
+    - Trigram postings -> substring queries (3+ characters): candidates come from
+      intersecting the posting lists of the query's trigrams, then are verified.
+    - Sorted tokens    -> prefix queries for 1-2 character inputs (e.g. "sq" -> SQL).
+
+    Results are row positions (usable with df.iloc), sorted ascending.
+    The posting arrays are views into the mapped files; only the token list is copied.
+    """
+    def __init__(self, texts, trigrams, tokens):
+        self.texts = _array(texts.column("Text"))
+        self.size = len(self.texts)
+
+        rows = _array(trigrams.column("Rows"))
+        self.trigram_keys = _array(trigrams.column("Trigram")).to_numpy()
+        self.trigram_offsets = rows.offsets.to_numpy()
+        self.trigram_rows = rows.values.to_numpy()
+
+        rows = _array(tokens.column("Rows"))
+        self.tokens = tokens.column("Token").to_pylist()
+        self.token_offsets = rows.offsets.to_numpy()
+        self.token_rows = rows.values.to_numpy()
+
+    @classmethod
+    def from_frame(cls, df, columns=SEARCH_COLUMNS):
+        """Builds the postings in memory (for data that wasn't published by the processor)."""
+        return cls(*build_search_tables(df, columns))
+
+    @classmethod
+    def load(cls, version=None):
+        """Memory-maps the published postings of `version`. None if that version has none."""
+        names = [storage.SEARCH_TEXTS_FILE, storage.SEARCH_TRIGRAMS_FILE, storage.SEARCH_TOKENS_FILE]
+        paths = [storage.artifact_path(name, version) for name in names]
+        if not all(path and os.path.exists(path) for path in paths):
+            return None
+        return cls(*[storage.read_arrow(name, version) for name in names])
+
+    def search(self, query):
+        """Row positions whose text contains `query` (case-insensitive, literal match)."""
+        query = query.strip().lower()
+        if not query:
+            return np.arange(self.size, dtype=np.int32)
+        if len(query) < 3:
+            return self._prefix(query)
+        return self._substring(query)
+
+    def _prefix(self, prefix):
+        start = bisect.bisect_left(self.tokens, prefix)
+        end = bisect.bisect_left(self.tokens, prefix + "\uffff")
+        if start == end:
+            return np.array([], dtype=np.int32)
+        # Tokens are sorted, so the postings of all matching tokens are one slice
+        return np.unique(self.token_rows[self.token_offsets[start]:self.token_offsets[end]])
+
+    def _substring(self, query):
+        grams = {query[j:j + 3] for j in range(len(query) - 2)}
+        postings = []
+        for gram in grams:
+            key = trigram_key(gram)
+            i = np.searchsorted(self.trigram_keys, key)
+            if i == len(self.trigram_keys) or self.trigram_keys[i] != key:
+                return np.array([], dtype=np.int32)
+            postings.append(self.trigram_rows[self.trigram_offsets[i]:self.trigram_offsets[i + 1]])
+
+        # Intersect smallest lists first
+        postings.sort(key=len)
+        candidates = postings[0]
+        for ids in postings[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if len(candidates) == 0:
+                return candidates
+
+        # Trigrams can match out of order -> confirm the real substring
+        if len(grams) == 1 and len(query) == 3:
+            return candidates
+        matches = pc.match_substring(self.texts.take(pa.array(candidates)), query)
+        return candidates[matches.to_numpy(zero_copy_only=False)]
@@ -0,0 +1,370 @@
+import os
+import datetime
+import json
+import shutil
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+# Append-only history of scraped jobs, one hive-style partition per scrape date:
+#   data/history/date=2026-01-15/part-<time>.parquet
+HISTORY_DIR = "data/history"
+
+# Processed artifacts are published as a whole, one directory per data version:
+#   data/published/<data_version>/*.parquet  +  data/published/CURRENT (name of the live version)
+# Readers only ever see a complete set of files; switching versions is one atomic rename.
+PUBLISH_DIR = "data/published"
+CURRENT_POINTER = os.path.join(PUBLISH_DIR, "CURRENT")
+KEEP_VERSIONS = 2
+# Held while a process refreshes the published data (app replicas, cron, CLI), see acquire_lock()
+REFRESH_LOCK = os.path.join(PUBLISH_DIR, "refresh.lock")
+LOCK_STALE_SECONDS = 2 * 60 * 60  # a lock this old was left behind by a crashed process
+
+CLEAN_DATA_FILE = "wuzzuf_jobs_clean.parquet"
+# Uncompressed Arrow IPC (Feather v2) files are memory-mapped by the app: no parsing,
+# no copy, and the OS page cache shares them between sessions and processes.
+CLEAN_SNAPSHOT_FILE = "wuzzuf_jobs_clean.arrow"  # same rows as CLEAN_DATA_FILE
+# Normalized skills (built by the processor next to the clean data)
+SKILLS_FILE = "skills.arrow"            # Skill ID, Skill, Count (sorted by Count)
+JOB_SKILLS_FILE = "job_skills.parquet"  # Job ID, Skill ID (one row per job-skill pair)
+# Materialized counts for the dashboard: Dimension, Value, Value 2, Count
+AGGREGATES_FILE = "aggregates.arrow"
+# Indexed SQLite copy of the clean data + skills (see queries.py)
+DATABASE_FILE = "jobs.db"
+# Details page search postings (see search.py): lowercase texts, trigram and token posting lists
+SEARCH_TEXTS_FILE = "search_texts.arrow"
+SEARCH_TRIGRAMS_FILE = "search_trigrams.arrow"
+SEARCH_TOKENS_FILE = "search_tokens.arrow"
+
+# Job detail pages (posting date, vacancies, requirements), one JSON record per line.
+# Append-only and keyed by Job URL: every posting is fetched once in its lifetime (see enrich.py).
+JOB_DETAILS_PATH = "data/job_details.jsonl"
+DETAIL_FIELDS = {  # record key -> column name in the clean data
+    "posted_date": "Posted Date",
+    "valid_through": "Valid Through",
+    "vacancies": "Vacancies",
+    "requirements": "Requirements",
+}
+
+# Legacy CSV (before the history store). Imported once if it's still around.
+LEGACY_RAW_CSV = "data/wuzzuf_jobs_raw.csv"
+
+RAW_SCHEMA = pa.schema([
+    ("Job Title", pa.string()),
+    ("Company Name", pa.string()),
+    ("Location", pa.string()),
+    ("Job Type", pa.string()),
+    ("Level", pa.string()),
+    ("Years of Experience", pa.string()),
+    ("Skills", pa.string()),
+    ("Country", pa.string()),
+    ("Job URL", pa.string()),
+    ("Scraped At", pa.timestamp("s")),
+])
+
+
+def _to_raw_table(df, scraped_at):
+    """Aligns a DataFrame to RAW_SCHEMA (missing columns become nulls, extra columns are dropped)."""
+    df = df.copy()
+    df["Scraped At"] = pd.Timestamp(scraped_at).floor("s")
+    for field in RAW_SCHEMA:
+        if field.name not in df.columns:
+            df[field.name] = None
+    return pa.Table.from_pandas(df[RAW_SCHEMA.names], schema=RAW_SCHEMA, preserve_index=False)
+
+
+def write_snapshot(df, scraped_at=None, history_dir=HISTORY_DIR, part_name=None):
+    """
+    Appends scraped rows to the partition of their scrape date.
+    Never rewrites existing files, every call adds a new part file
+    (part_name lets the caller control file order within the partition).
+    Returns the path written (or None if df is empty).
+    """
+    if df.empty:
+        return None
+    scraped_at = scraped_at or datetime.datetime.now()
+    partition = os.path.join(history_dir, f"date={scraped_at:%Y-%m-%d}")
+    os.makedirs(partition, exist_ok=True)
+
+    name = part_name or f"part-{scraped_at:%H%M%S%f}-{os.getpid()}.parquet"
+    path = os.path.join(partition, name)
+    # Write to a hidden temp name first (ignored by the dataset reader),
+    # so readers never see a half-written file
+    tmp_path = os.path.join(partition, "." + name + ".tmp")
+    pq.write_table(_to_raw_table(df, scraped_at), tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def list_dates(history_dir=HISTORY_DIR):
+    """Sorted list of snapshot dates (datetime.date) available in the history store."""
+    if not os.path.isdir(history_dir):
+        return []
+    dates = []
+    for name in os.listdir(history_dir):
+        if name.startswith("date="):
+            try:
+                dates.append(datetime.date.fromisoformat(name[len("date="):]))
+            except ValueError:
+                continue
+    return sorted(dates)
+
+
+def _as_date(value):
+    if value is None or isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value))
+
+
+def list_parts(start_date=None, end_date=None, history_dir=HISTORY_DIR):
+    """Sorted paths of all part files in the partitions between start_date and end_date."""
+    start_date, end_date = _as_date(start_date), _as_date(end_date)
+    paths = []
+    for date in list_dates(history_dir):
+        if (start_date and date < start_date) or (end_date and date > end_date):
+            continue
+        partition = os.path.join(history_dir, f"date={date.isoformat()}")
+        for name in sorted(os.listdir(partition)):
+            if name.endswith(".parquet") and not name.startswith("."):
+                paths.append(os.path.join(partition, name))
+    return paths
+
+
+def read_parts(paths, columns=None):
+    """Loads specific part files (e.g. only the ones added since the last run)."""
+    frames = []
+    for path in paths:
+        df = pq.read_table(path, columns=columns).to_pandas()
+        # Same partition column read_history() adds
+        date_str = os.path.basename(os.path.dirname(path))[len("date="):]
+        df["date"] = datetime.date.fromisoformat(date_str)
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=columns or RAW_SCHEMA.names)
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_history(start_date=None, end_date=None, columns=None, filters=None, history_dir=HISTORY_DIR):
+    """
+    Loads scraped jobs between start_date and end_date (inclusive, either can be None).
+
+    columns -> only these columns are read from disk (column projection)
+    filters -> extra pyarrow/pandas style predicates, e.g. [("Level", "==", "Entry Level")],
+               pushed down to the Parquet reader so non-matching row groups are skipped.
+    The date range is applied on the partition key, so other days aren't even opened.
+    """
+    if not list_dates(history_dir):
+        return pd.DataFrame(columns=columns or RAW_SCHEMA.names)
+
+    date_filters = []
+    if start_date:
+        date_filters.append(("date", ">=", str(start_date)))
+    if end_date:
+        date_filters.append(("date", "<=", str(end_date)))
+
+    df = pd.read_parquet(
+        history_dir,
+        engine="pyarrow",
+        columns=columns,
+        filters=(date_filters + list(filters or [])) or None,
+    )
+    # The partition key comes back as a categorical of strings
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"].astype(str)).dt.date
+    return df
+
+
+def import_legacy_csv(csv_path=LEGACY_RAW_CSV, history_dir=HISTORY_DIR):
+    """
+    One-time migration: moves rows from the old raw CSV into the history store,
+    dated by the CSV's modification time. Skipped once any history exists.
+    """
+    if list_dates(history_dir) or not os.path.exists(csv_path):
+        return 0
+    try:
+        df = pd.read_csv(csv_path, dtype=str)
+    except pd.errors.EmptyDataError:
+        return 0
+    scraped_at = datetime.datetime.fromtimestamp(os.path.getmtime(csv_path))
+    write_snapshot(df, scraped_at=scraped_at, history_dir=history_dir)
+    print(f"Imported {len(df)} rows from {csv_path} into {history_dir}")
+    return len(df)
+
+
+def append_job_details(records, path=JOB_DETAILS_PATH):
+    """Appends detail records ({"job_url", "status", "fetched_at", posted_date, ...}) to the details store."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _job_detail_records(path):
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # half-written last line of an interrupted run
+
+
+def job_detail_urls(path=JOB_DETAILS_PATH):
+    """Job URLs already in the details store (fetched or known to be gone)."""
+    return {record["job_url"] for record in _job_detail_records(path)}
+
+
+def read_job_details(path=JOB_DETAILS_PATH):
+    """Detail fields per Job URL as a DataFrame (Job URL + DETAIL_FIELDS columns), one row per URL."""
+    records = {}
+    for record in _job_detail_records(path):
+        if record.get("status") == 200:
+            records[record["job_url"]] = record  # latest record wins
+    df = pd.DataFrame(list(records.values()), columns=["job_url"] + list(DETAIL_FIELDS))
+    return df.rename(columns=dict(DETAIL_FIELDS, job_url="Job URL"))
+
+
+def write_parquet(df, path):
+    """Saves a DataFrame as Parquet (atomic replace)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    df.to_parquet(path + ".tmp", engine="pyarrow", index=False)
+    os.replace(path + ".tmp", path)
+
+
+def read_parquet(path, columns=None):
+    """Loads a Parquet file, or an empty DataFrame if it hasn't been built yet."""
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_parquet(path, engine="pyarrow", columns=columns)
+
+
+def current_version():
+    """Data version currently published (None if nothing was published yet). One small file read."""
+    try:
+        with open(CURRENT_POINTER, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def artifact_path(name, version=None):
+    """Path of a published artifact (defaults to the current version)."""
+    version = version or current_version()
+    if version is None:
+        return None
+    return os.path.join(PUBLISH_DIR, version, name)
+
+
+def read_arrow(name, version=None, columns=None):
+    """
+    Memory-mapped Arrow table of an .arrow artifact (None if it doesn't exist).
+    Column buffers point straight into the mapped file, nothing is read until it's used.
+    """
+    path = artifact_path(name, version)
+    if path is None:
+        return None
+    return feather.read_table(path, columns=columns, memory_map=True)
+
+
+def read_artifact(name, version=None, columns=None):
+    path = artifact_path(name, version)
+    if path is None:
+        return pd.DataFrame()
+    if name.endswith(".arrow"):
+        return read_arrow(name, version, columns).to_pandas()
+    return read_parquet(path, columns)
+
+
+def publish(artifacts, version):
+    """
+    Writes {file name: DataFrame, Arrow table or writer(path)} as data version `version` and makes it current.
+    Files are written to a temp directory, renamed into place, and only then is the
+    CURRENT pointer swapped, so readers switch from the old set to the new one at once.
+    """
+    target = os.path.join(PUBLISH_DIR, version)
+    if not os.path.isdir(target):
+        tmp_dir = os.path.join(PUBLISH_DIR, f".tmp-{version}-{os.getpid()}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name, artifact in artifacts.items():
+            path = os.path.join(tmp_dir, name)
+            if callable(artifact):
+                artifact(path)
+            elif isinstance(artifact, pa.Table):
+                # One record batch, so readers get each column as a single zero-copy array
+                feather.write_feather(artifact, path, compression="uncompressed",
+                                      chunksize=max(artifact.num_rows, 1))
+            elif name.endswith(".arrow"):
+                # Uncompressed, so readers can memory-map it without decoding
+                feather.write_feather(artifact.reset_index(drop=True), path, compression="uncompressed")
+            else:
+                artifact.to_parquet(path, engine="pyarrow", index=False)
+        try:
+            os.replace(tmp_dir, target)
+        except OSError:
+            if not os.path.isdir(target):
+                raise
+            # Same version published by another process in the meantime (identical content)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    with open(CURRENT_POINTER + ".tmp", "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(CURRENT_POINTER + ".tmp", CURRENT_POINTER)
+    _prune_versions(keep=version)
+
+
+def acquire_lock(path=REFRESH_LOCK, stale_after=LOCK_STALE_SECONDS):
+    """
+    Cross-process lock file (created with O_EXCL, so it works on Windows too).
+    Returns True if this process now holds it, False if another one does.
+    A lock older than stale_after is taken over.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                age = time.time() - os.path.getmtime(path)
+            except OSError:
+                continue  # released in the meantime
+            if age < stale_after:
+                return False
+            print(f"Taking over a stale lock ({path}, {age / 60:.0f} min old).")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        with os.fdopen(fd, "w") as f:
+            f.write(f"{os.getpid()} {datetime.datetime.now().isoformat(timespec='seconds')}\n")
+        return True
+    return False
+
+
+def release_lock(path=REFRESH_LOCK):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _prune_versions(keep):
+    """Deletes old versions (keeping the newest KEEP_VERSIONS) so sessions still on the previous one keep working."""
+    versions = [
+        os.path.join(PUBLISH_DIR, name) for name in os.listdir(PUBLISH_DIR)
+        if not name.startswith(".") and os.path.isdir(os.path.join(PUBLISH_DIR, name))
+    ]
+    versions.sort(key=os.path.getmtime, reverse=True)
+    for path in versions[KEEP_VERSIONS:]:
+        if os.path.basename(path) != keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def read_clean(columns=None, version=None):
+    """Loads the processed dataset, or an empty DataFrame if it hasn't been built yet."""
+    return read_artifact(CLEAN_DATA_FILE, version, columns)
@@ -0,0 +1,131 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Seeded synthetic job-market data in the raw schema (same columns as the scraper output).
+# Used by the scale benchmarks; distributions are skewed like the real market:
+# a few big employers / cities / skills and a long tail.
+
+ROLES = [
+    "Data Analyst", "Business Analyst", "Cost Analyst", "Credit Analyst",
+    "Commercial Specialist (Junior Data Analyst)", "Ads Sales Quality Analyst (QA)",
+    "Financial Analyst", "Business Analyst - Customer Solutions",
+    "Central Operations Senior Analyst", "Tax Accountant", "Full Stack Developer",
+    "Machine Learning Engineer", "DevOps Engineer", "Product Manager"
+]
+
+ROLE_SKILLS = {
+    "Data Analyst": ["SQL", "Excel", "Power BI", "Python", "Tableau", "Statistics", "Data Analysis"],
+    "Business Analyst": ["Business Analysis", "Requirements", "Excel", "SQL", "Jira", "Communication"],
+    "Cost Analyst": ["Cost Accounting", "Excel", "Budgeting", "SAP", "Finance"],
+    "Credit Analyst": ["Credit Risk", "Banking", "Finance", "Excel", "Financial Analysis"],
+    "Commercial Specialist (Junior Data Analyst)": ["Excel", "Sales", "Power BI", "Data Analysis"],
+    "Ads Sales Quality Analyst (QA)": ["Quality Assurance", "Sales", "Excel", "Communication"],
+    "Financial Analyst": ["Financial Analysis", "Excel", "Accounting", "Finance", "Power BI"],
+    "Business Analyst - Customer Solutions": ["Business Analysis", "Customer Service", "SQL", "Excel"],
+    "Central Operations Senior Analyst": ["Operations", "Excel", "SQL", "Supply Chain", "Data Analysis"],
+    "Tax Accountant": ["Tax", "Accounting", "Excel", "ERP", "Finance"],
+    "Full Stack Developer": ["JavaScript", "React", "Node.js", "Python", "SQL", "Git", "Docker"],
+    "Machine Learning Engineer": ["Machine Learning", "Python", "PyTorch", "TensorFlow", "SQL", "Docker"],
+    "DevOps Engineer": ["Docker", "Kubernetes", "AWS", "Linux", "CI/CD", "Git"],
+    "Product Manager": ["Product Management", "Agile", "Jira", "Communication", "Data Analysis"],
+}
+COMMON_SKILLS = ["Computer Science", "English", "Teamwork", "Problem Solving", "Information Technology (IT)"]
+
+TITLE_PREFIXES = ["", "", "", "Junior ", "Senior ", "Lead "]
+
+LOCATIONS = [
+    ("Nasr City, Cairo, Egypt", 14), ("Maadi, Cairo, Egypt", 12), ("New Cairo, Cairo, Egypt", 12),
+    ("Heliopolis, Cairo, Egypt", 8), ("Cairo, Egypt", 8), ("Sheikh Zayed, Giza, Egypt", 7),
+    ("Smart Village, Giza, Egypt", 6), ("Dokki, Giza, Egypt", 5), ("6th of October, Giza, Egypt", 6),
+    ("Alexandria, Egypt", 6), ("Mansoura, Dakahlia, Egypt", 2), ("Tanta, Gharbia, Egypt", 1),
+    ("Port Said, Egypt", 1), ("Riyadh, Saudi Arabia", 2), ("Dubai, United Arab Emirates", 2),
+]
+
+LEVELS = [
+    ("Entry Level", "0 - 1 Yrs of Exp", 25), ("Experienced", "2 - 4 Yrs of Exp", 40),
+    ("Experienced", "3 - 5 Yrs of Exp", 15), ("Manager", "5+ Yrs of Exp", 10),
+    ("Senior Management", "10+ Yrs of Exp", 3), ("Student", "N/A", 7),
+]
+
+JOB_TYPES = [("Full Time, On-site", 55), ("Full Time, Hybrid", 20), ("Full Time, Remote", 8),
+             ("Part Time, On-site", 7), ("Internship, On-site", 5), ("Freelance / Project, Remote", 5)]
+
+COMPANY_WORDS = ["Nile", "Delta", "Pyramid", "Cairo", "Smart", "Digital", "Global", "Misr", "Horizon",
+                 "Sphinx", "Lotus", "Alpha", "Data", "Cloud", "Falcon", "Oasis", "Nova", "Vertex"]
+COMPANY_SUFFIXES = ["Solutions", "Technologies", "Group", "Bank", "Consulting", "Systems", "Holding", "Labs"]
+
+
+def _weights(pairs):
+    w = np.array([p[-1] for p in pairs], dtype=float)
+    return w / w.sum()
+
+
+def _zipf_weights(n, a=1.1):
+    w = 1.0 / np.arange(1, n + 1) ** a
+    return w / w.sum()
+
+
+def make_companies(rng, n=2000):
+    """Unique fake company names (n <= 2448 word combinations)."""
+    names = [f"{a} {b} {suffix}" for a in COMPANY_WORDS for b in COMPANY_WORDS if a != b
+             for suffix in COMPANY_SUFFIXES]
+    return list(rng.permutation(names)[:n])
+
+
+def generate_raw_data(n_rows, seed=42):
+    """Generates `n_rows` raw-schema job postings (deterministic for a given seed)."""
+    rng = np.random.default_rng(seed)
+    companies = np.array(make_companies(rng))
+
+    role_idx = rng.choice(len(ROLES), size=n_rows, p=_zipf_weights(len(ROLES), 0.8))
+    prefix_idx = rng.integers(0, len(TITLE_PREFIXES), size=n_rows)
+    company_idx = rng.choice(len(companies), size=n_rows, p=_zipf_weights(len(companies)))
+    location_idx = rng.choice(len(LOCATIONS), size=n_rows, p=_weights(LOCATIONS))
+    level_idx = rng.choice(len(LEVELS), size=n_rows, p=_weights(LEVELS))
+    type_idx = rng.choice(len(JOB_TYPES), size=n_rows, p=_weights(JOB_TYPES))
+    skill_counts = rng.integers(2, 9, size=n_rows)
+    max_pool = max(len(v) for v in ROLE_SKILLS.values()) + len(COMMON_SKILLS)
+    skill_draws = rng.random((n_rows, max_pool))
+
+    titles, skills = [], []
+    for i in range(n_rows):
+        role = ROLES[role_idx[i]]
+        titles.append(TITLE_PREFIXES[prefix_idx[i]] + role)
+        pool = ROLE_SKILLS[role] + COMMON_SKILLS
+        # Skewed pick: earlier skills in the pool are more common
+        order = np.argsort(skill_draws[i, :len(pool)] * np.arange(1, len(pool) + 1))
+        skills.append(", ".join(pool[j] for j in order[:skill_counts[i]]))
+
+    locations = [LOCATIONS[i][0] for i in location_idx]
+    return pd.DataFrame({
+        "Job Title": titles,
+        "Company Name": companies[company_idx],
+        "Location": locations,
+        "Job Type": [JOB_TYPES[i][0] for i in type_idx],
+        "Level": [LEVELS[i][0] for i in level_idx],
+        "Years of Experience": [LEVELS[i][1] for i in level_idx],
+        "Skills": skills,
+        "Country": [loc.rsplit(", ", 1)[-1] for loc in locations],
+        "Job URL": [f"/jobs/p/synthetic-{seed}-{i}" for i in range(n_rows)],
+    })
+
+
+def write_raw_csv(n_rows, path, seed=42):
+    """Writes a synthetic raw CSV and returns its path."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    generate_raw_data(n_rows, seed).to_csv(path, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic raw job data (CSV).")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="data/synthetic")
+    args = parser.parse_args()
+    for n in args.rows:
+        path = write_raw_csv(n, os.path.join(args.out, f"wuzzuf_jobs_raw_{n}.csv"), args.seed)
+        print(f"Wrote {n} rows to {path}")
@@ -0,0 +1,63 @@
+import contextlib
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Flat repo: make the top-level modules importable when pytest runs from anywhere
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import processor  # noqa: E402
+import storage  # noqa: E402
+import synthetic  # noqa: E402
+
+N_ROWS = 3000
+N_NEAR_DUPLICATES = 300
+
+
+def _near_duplicates(raw, n, seed):
+    """Copies of n postings as another query would list them: other title casing, skills reversed."""
+    rows = raw.sample(n, random_state=seed).copy()
+    rows['Job Title'] = rows['Job Title'].str.upper()
+    rows['Skills'] = rows['Skills'].str.split(", ").map(lambda skills: ", ".join(reversed(skills)))
+    rows['Job URL'] = rows['Job URL'] + "-copy"
+    return rows
+
+
+@pytest.fixture(scope="session")
+def published_version(tmp_path_factory):
+    """
+    Synthetic postings (plus near-duplicates) run through the real processor in a scratch directory.
+    Returns (scratch directory, data version); storage paths are relative to that directory.
+    """
+    raw = synthetic.generate_raw_data(N_ROWS, seed=7)
+    raw = raw.sample(frac=1, random_state=7).reset_index(drop=True)
+    raw = pd.concat([raw, _near_duplicates(raw, N_NEAR_DUPLICATES, seed=7)], ignore_index=True)
+
+    directory = tmp_path_factory.mktemp("published")
+    with inside(directory):
+        storage.write_snapshot(raw)
+        version = processor.refresh_artifacts(force=True)
+    return directory, version
+
+
+@pytest.fixture(scope="session")
+def published(published_version):
+    """(clean frame, skills, job_skills) of the published version, as the app loads them."""
+    directory, version = published_version
+    with inside(directory):
+        df = storage.read_clean(version=version)
+        skills = storage.read_artifact(storage.SKILLS_FILE, version)
+        job_skills = storage.read_artifact(storage.JOB_SKILLS_FILE, version)
+    return df, skills, job_skills
+
+
+@contextlib.contextmanager
+def inside(directory):
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import aggregates
+import bitmaps
+import processor
+
+
+@pytest.fixture(scope="module")
+def cross_filter(published):
+    """CrossFilter built the way the app builds it, plus the unique postings for the naive side."""
+    df, skills, job_skills = published
+    skill_names = skills.sort_values('Skill ID')['Skill'].to_numpy()
+    crossfilter = bitmaps.CrossFilter(df, job_skills, skill_names, aggregates.CUBE_DIMENSIONS)
+    unique = df[df['Cluster ID'] == df['Job ID']]
+    skill_rows = job_skills.merge(skills[['Skill ID', 'Skill']], on='Skill ID')
+    return crossfilter, unique, skill_rows
+
+
+def naive_filter(unique, skill_rows, selections):
+    """Unique postings matching every non-empty selection, with plain pandas masks."""
+    keep = pd.Series(True, index=unique.index)
+    for column, selected in selections.items():
+        if not selected:
+            continue
+        if column == "Skill":
+            job_ids = skill_rows.loc[skill_rows['Skill'].isin(selected), 'Job ID']
+            keep &= unique['Job ID'].isin(job_ids)
+        else:
+            keep &= unique[column].astype(str).replace("nan", "Unknown").isin(selected)
+    return unique[keep]
+
+
+def naive_tables(rows, skill_rows):
+    """(cube, skills) of the filtered postings, counted from scratch."""
+    cube = processor.build_aggregate_cube(rows)
+    cube = cube[~cube['Dimension'].str.contains("|", regex=False)]
+    skills = (skill_rows[skill_rows['Job ID'].isin(rows['Job ID'])]
+              .groupby('Skill').size().reset_index(name='Count'))
+    skills = skills.sort_values(['Count', 'Skill'], ascending=[False, True])
+    return cube.reset_index(drop=True), skills.reset_index(drop=True)
+
+
+def random_selections(crossfilter, rng, n):
+    """Filter combinations mixing frequent (dense) and rare (sparse) values, and a value that doesn't exist."""
+    combinations = [{}]
+    for _ in range(n):
+        selections = {}
+        for column in rng.choice(bitmaps.FILTER_COLUMNS, size=rng.integers(1, 3), replace=False):
+            options = crossfilter.options(column)
+            picks = [options[i] for i in rng.choice(len(options), size=min(len(options), rng.integers(1, 4)),
+                                                     replace=False)]
+            if rng.random() < 0.3:
+                picks.append(options[0])  # the most frequent value, always a dense bitset
+            if rng.random() < 0.1:
+                picks.append("No such value")
+            selections[column] = picks
+        combinations.append(selections)
+    return combinations
+
+
+def test_index_has_dense_and_sparse_values(cross_filter):
+    crossfilter, _, _ = cross_filter
+    index = crossfilter.indexes["Company Name"]
+    assert len(index.dense_values) > 0 and len(index.sparse_values) > 0
+
+
+def test_options_match_value_counts(cross_filter):
+    crossfilter, unique, _ = cross_filter
+    for column in ["City", "Level", "Job Type"]:
+        counts = unique[column].astype(str).value_counts().reset_index()
+        counts.columns = ["Value", "Count"]
+        expected = counts.sort_values(["Count", "Value"], ascending=[False, True])["Value"].tolist()
+        assert crossfilter.options(column) == expected
+
+
+def test_cross_filter_matches_naive_filtering(cross_filter):
+    crossfilter, unique, skill_rows = cross_filter
+    for selections in random_selections(crossfilter, np.random.default_rng(3), 40):
+        rows = naive_filter(unique, skill_rows, selections)
+        assert crossfilter.count(selections) == len(rows), selections
+
+        cube, skills = crossfilter.tables(selections)
+        expected_cube, expected_skills = naive_tables(rows, skill_rows)
+        pd.testing.assert_frame_equal(cube.reset_index(drop=True), expected_cube, check_dtype=False)
+        pd.testing.assert_frame_equal(skills.reset_index(drop=True), expected_skills, check_dtype=False)
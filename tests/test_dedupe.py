@@ -0,0 +1,83 @@
+import zlib
+
+import numpy as np
+import pytest
+
+import dedupe
+
+
+def naive_signature(tokens, num_perm=dedupe.NUM_PERM, seed=dedupe.SEED):
+    """MinHash of one token set, one permutation and one token at a time."""
+    a, b = dedupe._permutations(num_perm, seed)
+    return [min((int(a[k]) * zlib.crc32(t.encode("utf-8")) + int(b[k])) % dedupe.PRIME for t in tokens)
+            for k in range(num_perm)]
+
+
+def naive_clusters(signatures, threshold=dedupe.THRESHOLD):
+    """Connected components of every pair whose signatures agree on >= threshold of positions."""
+    n = len(signatures)
+    label = list(range(n))
+    for i in range(n):
+        similar = (signatures[i + 1:] == signatures[i]).mean(axis=1) >= threshold
+        for j in np.flatnonzero(similar) + i + 1:
+            old, new = max(label[i], label[j]), min(label[i], label[j])
+            if old != new:
+                label = [new if x == old else x for x in label]
+    return np.array(label)
+
+
+@pytest.fixture(scope="module")
+def postings(published):
+    """Distinct (title, company, skills) token sets of the synthetic data and their signatures."""
+    df, _, _ = published
+    keys = df[['Job Title', 'Company Name', 'Skills']].astype(str).drop_duplicates()
+    token_sets = [dedupe.posting_tokens(*row) for row in keys.itertuples(index=False)]
+    return token_sets, dedupe.minhash_signatures(token_sets)
+
+
+def test_signatures_match_naive_minhash(postings, monkeypatch):
+    token_sets, signatures = postings
+    for i in range(0, len(token_sets), 97):
+        assert signatures[i].tolist() == naive_signature(token_sets[i])
+    # Same result when the postings are hashed in many small chunks
+    monkeypatch.setattr(dedupe, "CHUNK_TOKENS", 50)
+    assert np.array_equal(dedupe.minhash_signatures(token_sets[:500]), signatures[:500])
+
+
+def test_lsh_matches_the_all_pairs_comparison(postings):
+    """Same clusters as comparing every pair of the whole fixture (no pair above the threshold is missed)."""
+    _, signatures = postings
+    labels = dedupe.lsh_clusters(signatures)
+    expected = naive_clusters(signatures)
+    assert len(np.unique(expected)) < len(signatures)  # the fixture has near-duplicates to find
+    assert np.array_equal(labels, expected)
+
+
+def test_lsh_bands_cover_the_threshold():
+    """Signatures that differ in as many positions as the threshold allows still share a bucket."""
+    rng = np.random.default_rng(5)
+    base = rng.integers(0, 2 ** 32, size=(1, dedupe.NUM_PERM), dtype=np.uint64).astype(np.uint32)
+    allowed = dedupe.NUM_PERM - int(np.ceil(dedupe.THRESHOLD * dedupe.NUM_PERM))
+    copies = np.repeat(base, 200, axis=0)
+    for row in copies[1:]:
+        changed = rng.choice(dedupe.NUM_PERM, size=allowed, replace=False)
+        row[changed] = rng.integers(0, 2 ** 32, size=allowed, dtype=np.uint64).astype(np.uint32)
+    assert np.all(dedupe.lsh_clusters(copies) == 0)
+
+
+def test_lsh_labels_are_first_members(postings):
+    _, signatures = postings
+    labels = dedupe.lsh_clusters(signatures)
+    for label in np.unique(labels):
+        assert np.flatnonzero(labels == label)[0] == label
+
+
+def test_near_duplicate_copies_share_a_cluster(published):
+    """The re-listed copies (title upper-cased, skills reversed) end up in their original's cluster."""
+    df, _, _ = published
+    urls = df['Job URL'].astype(str)
+    copies = df[urls.str.endswith("-copy")]
+    originals = df.set_index(urls)['Cluster ID']
+    assert len(copies) > 0
+    originals = originals.loc[copies['Job URL'].astype(str).str[:-len("-copy")]].to_numpy()
+    assert np.array_equal(copies['Cluster ID'].to_numpy(), originals)
@@ -0,0 +1,79 @@
+import re
+
+import numpy as np
+import pytest
+
+import search
+from conftest import inside
+
+QUERIES = ["python", "PYTHON", "sql", "data engineer", "senior", "cairo", "labs",
+           "Machine Learning", "ml", "sq", "py", "c", "x", "de,", " | ", "zzz", "", "   "]
+
+
+def naive_texts(df):
+    """One lowercase text per row, built row by row."""
+    columns = [c for c in search.SEARCH_COLUMNS if c in df.columns]
+    return [" | ".join(str(row[c]) for c in columns).lower() for _, row in df.iterrows()]
+
+
+def naive_search(texts, query):
+    """Rows containing the query (3+ characters) or having a word starting with it (1-2 characters)."""
+    query = query.strip().lower()
+    if not query:
+        return list(range(len(texts)))
+    if len(query) < 3:
+        return [i for i, text in enumerate(texts)
+                if any(word.startswith(query) for word in re.findall(r"\w+", text))]
+    return [i for i, text in enumerate(texts) if query in text]
+
+
+@pytest.fixture(scope="module")
+def index_and_texts(published_version, published):
+    """The memory-mapped index the processor published, and the texts for the naive scan."""
+    directory, version = published_version
+    with inside(directory):
+        index = search.SearchIndex.load(version)
+    df, _, _ = published
+    return index, naive_texts(df)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_naive_scan(index_and_texts, query):
+    index, texts = index_and_texts
+    assert index.search(query).tolist() == naive_search(texts, query)
+
+
+def test_search_words_from_the_data(index_and_texts):
+    """Every distinct skill (and its 3-character head) finds the same rows as a full scan."""
+    index, texts = index_and_texts
+    words = sorted({word for text in texts for word in text.split(" | ")[2].split(", ") if word})
+    assert words
+    for word in words:
+        for query in (word, word[:3]):
+            assert index.search(query).tolist() == naive_search(texts, query), query
+
+
+def test_search_results_are_sorted_row_positions(index_and_texts):
+    index, texts = index_and_texts
+    hits = index.search("engineer")
+    assert len(hits) > 0
+    assert np.all(np.diff(hits) > 0)
+    assert hits[-1] < len(texts)
+
+
+def test_in_memory_index_matches_the_published_one(index_and_texts, published):
+    index, _ = index_and_texts
+    df, _, _ = published
+    built = search.SearchIndex.from_frame(df)
+    for query in QUERIES:
+        assert built.search(query).tolist() == index.search(query).tolist(), query
+
+
+def test_postings_across_build_chunks(published, monkeypatch):
+    """Rows of later chunks land after the earlier ones in every posting list."""
+    df, _, _ = published
+    texts = naive_texts(df)
+    monkeypatch.setattr(search, "INDEX_CHUNK_ROWS", 257)
+    index = search.SearchIndex.from_frame(df)
+    for query in QUERIES:
+        assert index.search(query).tolist() == naive_search(texts, query), query
@@ -0,0 +1,141 @@
+import datetime
+import email.utils
+
+import pytest
+
+import scraper
+
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when the test says so."""
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scraper.time, "monotonic", clock)
+    return clock
+
+
+def finish(limiter, **outcome):
+    """One request through the window: take a slot, report its outcome."""
+    limiter.in_flight += 1
+    return limiter.release(**outcome)
+
+
+# === backoff_delay ===
+
+def test_backoff_grows_exponentially_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(scraper.random, "uniform", lambda low, high: high)  # top of the jitter range
+    delays = [scraper.backoff_delay(attempt) for attempt in range(8)]
+    expected = [min(scraper.RETRY_MAX_SECONDS, scraper.RETRY_BASE_SECONDS * 2 ** a) for a in range(8)]
+    assert delays == expected
+    assert delays[-1] == scraper.RETRY_MAX_SECONDS
+
+
+def test_backoff_jitter_stays_in_range():
+    for attempt in range(6):
+        ceiling = min(scraper.RETRY_MAX_SECONDS, scraper.RETRY_BASE_SECONDS * 2 ** attempt)
+        for _ in range(200):
+            assert 0 <= scraper.backoff_delay(attempt) <= ceiling
+
+
+def test_backoff_never_shorter_than_retry_after(monkeypatch):
+    monkeypatch.setattr(scraper.random, "uniform", lambda low, high: low)
+    assert scraper.backoff_delay(0, retry_after=45) == 45
+    assert scraper.backoff_delay(3, retry_after=None) == 0
+    monkeypatch.setattr(scraper.random, "uniform", lambda low, high: high)
+    assert scraper.backoff_delay(3, retry_after=1) == scraper.RETRY_BASE_SECONDS * 8
+
+
+# === parse_retry_after ===
+
+@pytest.mark.parametrize("value, expected", [
+    ("120", 120.0), ("0", 0.0), ("1.5", 1.5), ("-5", 0.0),
+    (None, None), ("", None), ("soon", None),
+])
+def test_retry_after_seconds(value, expected):
+    assert scraper.parse_retry_after(value) == expected
+
+
+def test_retry_after_http_date():
+    now = datetime.datetime.now(datetime.timezone.utc)
+    later = email.utils.format_datetime(now + datetime.timedelta(seconds=90), usegmt=True)
+    assert 80 <= scraper.parse_retry_after(later) <= 90
+    earlier = email.utils.format_datetime(now - datetime.timedelta(hours=1), usegmt=True)
+    assert scraper.parse_retry_after(earlier) == 0
+
+
+# === AdaptiveRateLimiter.release ===
+
+def test_fast_responses_increase_rate_and_window_up_to_the_ceiling(clock):
+    limiter = scraper.AdaptiveRateLimiter(rate=0.5, max_rate=1.0, max_concurrency=3)
+    assert finish(limiter, latency=0.2) is False
+    assert limiter.rate == pytest.approx(0.5 + scraper.RPS_STEP)
+    assert limiter.limit == pytest.approx(2.0)  # window += 1 / window
+    for _ in range(100):
+        finish(limiter, latency=0.2)
+    assert limiter.rate == 1.0
+    assert limiter.limit == 3
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.parametrize("outcome", [
+    {"latency": 0.3, "throttled": True},                # 429 / 5xx
+    {"latency": None},                                  # timeout / connection error
+    {"latency": scraper.SLOW_RESPONSE_SECONDS + 0.5},   # slow response
+])
+def test_trouble_halves_rate_and_window(clock, outcome):
+    limiter = scraper.AdaptiveRateLimiter(rate=1.6, max_concurrency=4)
+    limiter.limit = 4.0
+    assert finish(limiter, **outcome) is True
+    assert limiter.rate == pytest.approx(1.6 * scraper.BACKOFF_FACTOR)
+    assert limiter.limit == pytest.approx(4.0 * scraper.BACKOFF_FACTOR)
+
+
+def test_cut_stops_at_the_floor(clock):
+    limiter = scraper.AdaptiveRateLimiter(rate=0.5, min_rate=0.3)
+    for _ in range(5):
+        finish(limiter, throttled=True)
+        clock.now += scraper.DECREASE_COOLDOWN
+    assert limiter.rate == 0.3
+    assert limiter.limit == 1.0
+
+
+def test_latency_rise_counts_as_trouble_only_above_a_second(clock):
+    limiter = scraper.AdaptiveRateLimiter(rate=1.0)
+    for _ in range(5):
+        finish(limiter, latency=0.2)
+    # 4x the average but still fast -> increase
+    assert finish(limiter, latency=0.8) is False
+    # more than LATENCY_RISE_FACTOR x the average and over FAST_RESPONSE_SECONDS -> cut
+    rate = limiter.rate
+    assert finish(limiter, latency=scraper.FAST_RESPONSE_SECONDS + 0.5) is True
+    assert limiter.rate == pytest.approx(rate * scraper.BACKOFF_FACTOR)
+
+
+def test_one_cut_per_cooldown(clock):
+    limiter = scraper.AdaptiveRateLimiter(rate=1.6)
+    assert finish(limiter, throttled=True) is True
+    # A burst of errors inside the cooldown is one cut, not several
+    clock.now += scraper.DECREASE_COOLDOWN / 2
+    assert finish(limiter, throttled=True) is False
+    assert finish(limiter, latency=None) is False
+    assert limiter.rate == pytest.approx(0.8)
+    clock.now += scraper.DECREASE_COOLDOWN / 2
+    assert finish(limiter, throttled=True) is True
+    assert limiter.rate == pytest.approx(0.4)
+
+
+def test_retry_after_pauses_every_worker(clock):
+    limiter = scraper.AdaptiveRateLimiter()
+    finish(limiter, latency=0.1, throttled=True, retry_after=30)
+    assert limiter.paused_until == clock.now + 30
+    # A shorter Retry-After later never shortens the pause
+    finish(limiter, latency=0.1, throttled=True, retry_after=5)
+    assert limiter.paused_until == clock.now + 30